@@ -1,23 +1,75 @@
+import atexit
+import hashlib
+import itertools
 import os
-import json
-import requests
+import random
+import re
+import threading
+import time
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+import httpx
+import orjson
 import streamlit as st
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from html import escape
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 from agno.agent.agent import Agent
-from agno.run.response import RunEvent, RunResponse
-from agno.storage.postgres import PostgresStorage
+from agno.run.response import RunResponse
 from agno.utils.log import logger
 from agno.workflow.workflow import Workflow
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+
+if TYPE_CHECKING:
+    from agno.storage.postgres import PostgresStorage
 
 # Load environment variables
 load_dotenv()
 
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GITHUB_RETRY_STATUSES = {502, 503, 504}
+GITHUB_MAX_RETRIES = 3
+GITHUB_RATE_LIMIT_STATUSES = {403, 429}
+GITHUB_MAX_BACKOFF = 60.0  # longer rate limit waits return the response instead of blocking the dashboard
+MAX_ANALYSIS_WORKERS = 8
+GITHUB_MAX_CONCURRENCY = 5  # in-flight requests, kept low to stay clear of GitHub's secondary rate limits
+
+# Trimmed GitHub lists on disk, refreshed at the cadence each endpoint actually changes
+GITHUB_CACHE_DIR = Path(os.getenv("GITHUB_CACHE_DIR", ".cache/github"))
+GITHUB_CACHE_TTL = {"releases": 7 * 24 * 3600, "issues": 3600}
+GITHUB_ETAG_CACHE_SIZE = 32  # conditional-request entries per session; past since windows age out
+
+try:
+    import brotli  # noqa: F401 - httpx decodes br responses only when brotli is installed
+    GITHUB_ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    GITHUB_ACCEPT_ENCODING = "gzip, deflate"
+
+# Shared selection for every aliased repository in the batch query, mirroring the REST trimming below
+GITHUB_REPOSITORY_FRAGMENT = """
+fragment CompetitorData on Repository {
+  releases(first: 3, orderBy: {field: CREATED_AT, direction: DESC}) {
+    nodes { tagName name description publishedAt url }
+  }
+  issues(first: 20, filterBy: {since: $since}, orderBy: {field: CREATED_AT, direction: DESC}) {
+    nodes { title bodyText labels(first: 3) { nodes { name } } state createdAt url }
+  }
+}
+"""
+
+
+# Schemas are built at import, assignments are not re-validated and unknown keys from the LLM are dropped
+_MODEL_CONFIG = ConfigDict(defer_build=False, validate_assignment=False, extra="ignore")
+
 
 class Release(BaseModel):
+    model_config = _MODEL_CONFIG
+
     project_name: str = Field(..., description="Name of the project")
     version: str = Field(..., description="Release version")
     description: str = Field(..., description="Release notes summary")
@@ -26,20 +78,26 @@ class Release(BaseModel):
 
 
 class IssuePattern(BaseModel):
+    model_config = _MODEL_CONFIG
+
     pattern: str = Field(..., description="Issue pattern or category")
     count: int = Field(..., description="Number of occurrences")
-    example_links: List[str] = Field(default=[], description="Links to example issues")
+    example_links: List[str] = Field(default_factory=list, description="Links to example issues")
 
 
 class CompetitorAnalysis(BaseModel):
+    model_config = _MODEL_CONFIG
+
     project_name: str = Field(..., description="Name of the competitor project")
     repository_url: str = Field(..., description="Link to the GitHub repository")
-    recent_releases: List[Release] = Field(..., description="Recent releases with links")
-    key_features: List[str] = Field(..., description="Key new features")
-    recurring_issues: List[IssuePattern] = Field(..., description="Common issue patterns with example links")
+    recent_releases: List[Release] = Field(default_factory=list, description="Recent releases with links")
+    key_features: List[str] = Field(default_factory=list, description="Key new features")
+    recurring_issues: List[IssuePattern] = Field(default_factory=list, description="Common issue patterns with example links")
 
 
 class WeeklyReport(BaseModel):
+    model_config = _MODEL_CONFIG
+
     report_date: str = Field(..., description="Report date")
     analyses: List[CompetitorAnalysis] = Field(..., description="Competitor analyses")
     industry_trends: List[str] = Field(..., description="Cross-competitor trends")
@@ -49,132 +107,688 @@ class WeeklyReport(BaseModel):
 
 
 class CompetitiveAnalysesList(BaseModel):
+    model_config = _MODEL_CONFIG
+
     analyses: List[CompetitorAnalysis] = Field(..., description="List of competitor analyses")
 
 
+# Validators are compiled once at import and reused for every dict -> model conversion
+_WEEKLY_ADAPTER = TypeAdapter(WeeklyReport)
+_ANALYSIS_ADAPTER = TypeAdapter(CompetitorAnalysis)
+
+
+def coerce_response(content: Any, adapter: TypeAdapter) -> Optional[BaseModel]:
+    """Typed agent output, also accepting the JSON text or dict agno falls back to when parsing fails"""
+    try:
+        if isinstance(content, (str, bytes)):
+            return adapter.validate_json(content)
+        if isinstance(content, (BaseModel, dict)):
+            # validate_python passes an instance of the adapter's model straight through
+            return adapter.validate_python(content)
+    except ValidationError as e:
+        logger.warning(f"Agent response failed validation: {e}")
+    return None
+
+
+class GitHubTokenPool:
+    """Round-robin over GitHub tokens, skipping any whose rate limit is exhausted until it resets"""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self._cycle = itertools.cycle(tokens)
+        self._reset_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "GitHubTokenPool":
+        """Read comma-separated GITHUB_TOKENS, falling back to the single GITHUB_TOKEN"""
+        tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+        if not tokens and os.getenv("GITHUB_TOKEN"):
+            tokens = [os.getenv("GITHUB_TOKEN")]
+        return cls(tokens)
+
+    def next_token(self) -> Optional[str]:
+        if not self.tokens:
+            return None
+        with self._lock:
+            now = time.time()
+            for _ in range(len(self.tokens)):
+                token = next(self._cycle)
+                if self._reset_at.get(token, 0) <= now:
+                    return token
+            # Every token is exhausted; use the one whose window resets first
+            return min(self.tokens, key=lambda token: self._reset_at[token])
+
+    def has_available(self) -> bool:
+        """Whether any token is outside its rate limit window"""
+        with self._lock:
+            now = time.time()
+            return any(self._reset_at.get(token, 0) <= now for token in self.tokens)
+
+    def update(self, token: str, headers: httpx.Headers) -> None:
+        """Record rate limit headers so exhausted tokens are skipped until X-RateLimit-Reset"""
+        if headers.get("X-RateLimit-Remaining") != "0":
+            return
+        reset = headers.get("X-RateLimit-Reset")
+        with self._lock:
+            self._reset_at[token] = float(reset) if reset else time.time() + 60
+
+
+def github_since(days: int = 7) -> str:
+    """UTC ISO cutoff for the issues window, floored to the hour so cached fetches share a key within the hour"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    return cutoff.replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+@st.cache_resource(show_spinner=False)
+def get_github_client() -> httpx.Client:
+    """One HTTP/2 client per process multiplexes every GitHub call over a single pooled TLS connection"""
+    client = httpx.Client(
+        headers={"Accept": "application/vnd.github+json", "Accept-Encoding": GITHUB_ACCEPT_ENCODING},
+        timeout=httpx.Timeout(20.0),
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=GITHUB_MAX_RETRIES,  # connection errors only; status retries are handled in _send
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        ),
+    )
+    atexit.register(client.close)
+    return client
+
+
+@st.cache_resource(show_spinner=False)
+def get_github_tokens() -> GitHubTokenPool:
+    """Token pool shared by every session, so rate limit state is tracked once per process"""
+    return GitHubTokenPool.from_env()
+
+
+@st.cache_resource(show_spinner=False)
+def get_github_slots() -> threading.BoundedSemaphore:
+    """Process-wide cap on in-flight GitHub requests, however many sessions are running analyses"""
+    return threading.BoundedSemaphore(GITHUB_MAX_CONCURRENCY)
+
+
+class GitHubDiskCache:
+    """JSON-on-disk cache of trimmed GitHub lists keyed by (owner, repo, endpoint), expiring per GITHUB_CACHE_TTL"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, owner: str, repo: str, endpoint: str) -> Path:
+        return self.directory / f"{owner}__{repo}__{endpoint}.json"
+
+    def get(self, owner: str, repo: str, endpoint: str) -> Optional[List[Dict]]:
+        try:
+            entry = orjson.loads(self._path(owner, repo, endpoint).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        if time.time() - entry["fetched_at"] > GITHUB_CACHE_TTL[endpoint]:
+            return None
+        return entry["data"]
+
+    def set(self, owner: str, repo: str, endpoint: str, data: List[Dict]) -> None:
+        if not data:
+            # Empty lists are indistinguishable from failed fetches, so they are never pinned for a whole TTL
+            return
+        path = self._path(owner, repo, endpoint)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(orjson.dumps({"fetched_at": time.time(), "data": data}))
+            tmp_path.replace(path)  # atomic, so concurrent readers never see a partial file
+        except OSError as e:
+            logger.warning(f"Could not write GitHub cache {path}: {e}")
+
+
+RELEASE_BODY_TOKENS = 150
+RELEASE_BODY_CHARS = 500  # fallback cap when tiktoken is unavailable
+_MARKDOWN_TABLE_ROW = re.compile(r"^[ \t]*\|.*\|[ \t\r]*(?:\r?\n|$)", re.M)  # GitHub bodies often use CRLF
+
+
+@lru_cache(maxsize=1)
+def _release_body_encoding() -> Optional[Any]:
+    """tiktoken encoding used to cap release bodies, or None when tiktoken or its encoding file is unavailable"""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception:  # not installed, or the encoding could not be downloaded
+        return None
+
+
+def trim_release_body(body: str) -> str:
+    """Strip markdown tables (changelog matrices cost many tokens for little signal) and cap the body by tokens"""
+    body = _MARKDOWN_TABLE_ROW.sub("", body)
+    encoding = _release_body_encoding()
+    if encoding is None:
+        return body[:RELEASE_BODY_CHARS]
+    if len(body) <= RELEASE_BODY_TOKENS:
+        return body  # every token covers at least one character
+    # Only encode a prefix that is certainly long enough; tokens average several characters
+    tokens = encoding.encode(body[:RELEASE_BODY_TOKENS * 8], disallowed_special=())
+    return encoding.decode(tokens[:RELEASE_BODY_TOKENS])
+
+
+_RELEASE_FIELDS = itemgetter("tag_name", "name", "body", "published_at", "html_url")
+_ISSUE_FIELDS = itemgetter("title", "body", "labels", "state", "created_at", "html_url")
+
+
+def limit_releases(releases_data: List[Dict]) -> List[Dict]:
+    """Limit release data to essential fields only, including URLs"""
+    limited_releases = []
+    for release in releases_data[:3]:  # Only last 3 releases
+        tag_name, name, body, published_at, html_url = _RELEASE_FIELDS(release)
+        limited_releases.append({
+            "tag_name": tag_name or "",
+            "name": name or "",
+            "body": trim_release_body(body or ""),  # Limit to 150 tokens
+            "published_at": published_at or "",
+            "html_url": html_url or ""  # Add release URL
+        })
+    return limited_releases
+
+
+def limit_issues(issues_data: List[Dict]) -> List[Dict]:
+    """Limit issue data to essential fields only, including URLs"""
+    limited_issues = []
+    for issue in issues_data[:20]:  # Only first 20 issues
+        title, body, labels, state, created_at, html_url = _ISSUE_FIELDS(issue)
+        limited_issues.append({
+            "title": title or "",
+            "body": (body or "")[:200],  # Limit to 200 chars
+            "labels": [label["name"] for label in (labels or ())[:3]],  # Max 3 labels
+            "state": state or "",
+            "created_at": created_at or "",
+            "html_url": html_url or ""  # Add issue URL
+        })
+    return limited_issues
+
+
+# GraphQL nodes always carry every selected field, so they unpack with itemgetter like the REST lists
+_GRAPHQL_RELEASE_FIELDS = itemgetter("tagName", "name", "description", "publishedAt", "url")
+_GRAPHQL_ISSUE_FIELDS = itemgetter("title", "bodyText", "labels", "state", "createdAt", "url")
+
+
+def limit_graphql_releases(release_nodes: List[Dict]) -> List[Dict]:
+    """Map GraphQL release nodes onto the trimmed REST release shape"""
+    limited_releases = []
+    for release in release_nodes:
+        tag_name, name, description, published_at, url = _GRAPHQL_RELEASE_FIELDS(release)
+        limited_releases.append({
+            "tag_name": tag_name or "",
+            "name": name or "",
+            "body": trim_release_body(description or ""),
+            "published_at": published_at or "",
+            "html_url": url or "",
+        })
+    return limited_releases
+
+
+def limit_graphql_issues(issue_nodes: List[Dict]) -> List[Dict]:
+    """Map GraphQL issue nodes onto the trimmed REST issue shape"""
+    limited_issues = []
+    for issue in issue_nodes:
+        title, body, labels, state, created_at, url = _GRAPHQL_ISSUE_FIELDS(issue)
+        limited_issues.append({
+            "title": title or "",
+            "body": (body or "")[:200],
+            "labels": [label["name"] for label in labels["nodes"][:3]],
+            "state": (state or "").lower(),
+            "created_at": created_at or "",
+            "html_url": url or "",
+        })
+    return limited_issues
+
+
+ISSUE_COLUMNS = ("title", "body", "labels", "created_at", "html_url")
+
+
+def encode_issue_columns(issues: List[Dict]) -> Dict[str, Any]:
+    """Columnar issue encoding for prompts - each field name is sent once instead of once per issue"""
+    columns: Dict[str, Any] = {field: [issue[field] for issue in issues] for field in ISSUE_COLUMNS}
+    columns["state"] = "".join("o" if issue["state"] == "open" else "c" for issue in issues)
+    return columns
+
+
+# Labels worth the LLM's attention; matched per word so "type: bug" or "kind/regression" also count
+SIGNAL_LABELS = frozenset({"bug", "regression", "crash", "performance", "perf", "security"})
+MIN_SIGNAL_ISSUES = 5
+_LABEL_WORD = re.compile(r"[a-z]+")
+
+
+def select_signal_issues(issues: List[Dict]) -> List[Dict]:
+    """Issues carrying a signal label, or every issue when too few match to be representative"""
+    signal_issues = [
+        issue for issue in issues
+        if any(not SIGNAL_LABELS.isdisjoint(_LABEL_WORD.findall(label.lower())) for label in issue["labels"])
+    ]
+    return signal_issues if len(signal_issues) >= MIN_SIGNAL_ISSUES else issues
+
+
+def count_issue_labels(issues: List[Dict], top_k: int = 5) -> List[Dict]:
+    """Count issue labels locally so recurring patterns come with deterministic counts and example links"""
+    label_counts = Counter(label for issue in issues for label in issue["labels"])
+    patterns = []
+    for label, count in label_counts.most_common(top_k):
+        if count > 1:  # Only labels that actually recur
+            example_links = [issue["html_url"] for issue in issues if label in issue["labels"]][:3]
+            patterns.append({"pattern": label, "count": count, "example_links": example_links})
+    return patterns
+
+
+# Invariant prompt requirements live in the agents' system prompts so every call shares an identical
+# prefix that provider-side prompt caching can reuse; the per-call user message carries only data
+ANALYZER_REQUIREMENTS = (
+    "Provide structured analysis with the following requirements:",
+    "1. Include the repository_url given with the data",
+    "2. For each recent release, include the version, description, date, and the html_url link",
+    "3. For recurring issue patterns, include example issue URLs (html_url) for each pattern",
+    "4. Use the precomputed issue label counts as-is for label-based patterns instead of recounting",
+    "5. Extract key features and strategic insights",
+    "IMPORTANT: Include actual URLs from the provided data so users can reference the source material.",
+    "Format the response according to the CompetitorAnalysis model structure.",
+)
+
+REPORT_REQUIREMENTS = (
+    "Provide a structured weekly report with:",
+    "1. Industry trends across competitors with specific examples",
+    "2. Strategic recommendations for product management with supporting evidence",
+    "3. Competitive threats and opportunities",
+    "4. Analysis methodology explaining the data sources and approach",
+    "IMPORTANT:",
+    "- Include detailed industry trends that reference specific competitor findings",
+    "- Ensure all recommendations are backed by specific evidence from the data",
+    "- Include methodology explaining how this analysis was conducted",
+    "- Focus on actionable insights for Product Managers",
+    "Format the response according to the WeeklyReport model structure.",
+)
+
+COMBINED_REQUIREMENTS = (
+    "Provide a structured weekly report with:",
+    "1. One analysis per competitor with its repository_url, recent releases (version, description, date and html_url link), key features, and recurring issue patterns with example issue URLs",
+    "   (use each competitor's precomputed issue_label_counts as-is for label-based patterns)",
+    "2. Industry trends across competitors with specific examples",
+    "3. Strategic recommendations for product management with supporting evidence",
+    "4. Analysis methodology explaining the data sources and approach",
+    "IMPORTANT: Include actual URLs from the provided data so users can reference the source material.",
+    "Format the response according to the WeeklyReport model structure.",
+)
+
+
+MAX_CACHED_REPORTS = 12  # roughly a quarter of weekly reports per session
+
+
+def lru_entries(cached: Any) -> List[List[Any]]:
+    """Session-state LRU cache as [key, value] pairs, least recently used first.
+
+    Recency is kept in a list because PostgreSQL JSONB session storage does not preserve object key order.
+    Sessions stored before this hold a plain {key: value} dict, whose order is taken as-is.
+    """
+    if isinstance(cached, dict):
+        return [[key, value] for key, value in cached.items()]
+    return cached or []
+
+
+def lru_put(cache: List[List[Any]], key: str, value: Any, maxsize: int = MAX_CACHED_REPORTS) -> None:
+    """Insert as most recently used, evicting the least recently used entries beyond maxsize"""
+    cache[:] = [entry for entry in cache if entry[0] != key]
+    cache.append([key, value])
+    del cache[:-maxsize]
+
+
+def lru_get(cache: List[List[Any]], key: str) -> Any:
+    """Look up a key and mark it most recently used"""
+    for index, (cached_key, value) in enumerate(cache):
+        if cached_key == key:
+            cache.append(cache.pop(index))
+            return value
+    return None
+
+
+# User-message templates: the static labels are encoded once and only per-call data is filled in
+ANALYSIS_PROMPT_HEADER = "Analyze competitive intelligence for {project_name} ({owner}/{repo}):\nRepository URL: {repository_url}\n"
+ANALYSIS_PROMPT_RELEASES = b"Recent Releases: "
+ANALYSIS_PROMPT_ISSUES = b"\nRecent Issues (columnar): "
+ANALYSIS_PROMPT_LABELS = b"\nIssue Label Counts: "
+REPORT_PROMPT_PREFIX = "Generate competitive intelligence report from competitor analyses:\nData: "
+COMBINED_PROMPT_PREFIX = b"Generate competitive intelligence report directly from GitHub data for each competitor:\nData: "
+
+
+def join_instructions(*lines: str) -> str:
+    """Pre-render instructions the way agno bullets a list, so each run reuses one string instead of re-joining"""
+    return "\n".join(f"- {line}" for line in lines)
+
+
+@st.cache_resource(show_spinner=False)
+def build_agents() -> Dict[str, Agent]:
+    """Build the agno agents once per process - Streamlit re-executes this script on every interaction
+
+    structured_outputs makes agno send the response model as a strict JSON schema, so the provider's
+    constrained decoding guarantees parseable output instead of relying on prompt-level formatting.
+    """
+    return {
+        "data_analyzer": Agent(
+            name="Data Analyzer",
+            instructions=join_instructions(
+                "You are a competitive intelligence data analyst.",
+                "Analyze GitHub data for a competitor project including releases and issues.",
+                "Extract key features from releases, identify recurring issue patterns, and categorize problems.",
+                "Issues are encoded column-wise: each field is a list where index i belongs to issue i,",
+                "and 'state' is a string with one character per issue (o = open, c = closed).",
+                "Issues may be pre-filtered to bug, regression, crash and performance reports; label counts cover every issue.",
+                "Focus on actionable insights for product managers.",
+                "IMPORTANT: Always include URLs and links in your analysis:",
+                "- For releases: include the version, description, date, and url from html_url field",
+                "- For issue patterns: include example_links using html_url from relevant issues", 
+                "- Include the repository_url in your response",
+                "Return structured analysis with recent releases, key features, and issue patterns with proper links.",
+                "Be concise and focus on the most important insights with supporting references.",
+                *ANALYZER_REQUIREMENTS,
+            ),
+            response_model=CompetitorAnalysis,
+            structured_outputs=True,
+        ),
+
+        "report_generator": Agent(
+            name="Report Generator", 
+            instructions=join_instructions(
+                "You are a strategic intelligence analyst for product managers.",
+                "Generate comprehensive weekly competitive intelligence reports with source attribution.",
+                "Analyze multiple competitor insights to identify industry trends and strategic opportunities.",
+                "Provide actionable recommendations based on competitive analysis.",
+                "Focus on market positioning, feature gaps, and strategic advantages.",
+                "CRITICAL: Always include sources and references:",
+                "- Populate the 'sources' field with all repository URLs analyzed",
+                "- Include methodology explaining data sources (GitHub releases, issues, etc.)",
+                "- Reference specific releases, issues, or repositories in your trends and recommendations",
+                "- Make industry trends detailed and reference specific competitor findings",
+                "Be concise and focus on the most important strategic insights with complete attribution.",
+                *REPORT_REQUIREMENTS,
+            ),
+            response_model=WeeklyReport,
+            structured_outputs=True,
+        ),
+
+        "combined_analyzer": Agent(
+            name="Competitive Analyst",
+            instructions=join_instructions(
+                "You are a competitive intelligence analyst for product managers.",
+                "Analyze raw GitHub releases and issues for several competitor projects in one pass.",
+                "For each competitor, extract key features from releases and identify recurring issue patterns.",
+                "Issues are encoded column-wise: each field is a list where index i belongs to issue i,",
+                "and 'state' is a string with one character per issue (o = open, c = closed).",
+                "Issues may be pre-filtered to bug, regression, crash and performance reports; label counts cover every issue.",
+                "Then identify cross-competitor industry trends and provide actionable strategic recommendations.",
+                "IMPORTANT: Always include URLs and links in your analysis:",
+                "- For releases: include the version, description, date, and url from html_url field",
+                "- For issue patterns: include example_links using html_url from relevant issues",
+                "- Include each competitor's repository_url and populate 'sources' with all repository URLs",
+                "- Include methodology explaining data sources (GitHub releases, issues, etc.)",
+                "Be concise and focus on the most important strategic insights with complete attribution.",
+                *COMBINED_REQUIREMENTS,
+            ),
+            response_model=WeeklyReport,
+            structured_outputs=True,
+        ),
+    }
+
+
+_AGENTS = build_agents()
+_DATA_ANALYZER: Agent = _AGENTS["data_analyzer"]
+_REPORT_GENERATOR: Agent = _AGENTS["report_generator"]
+_COMBINED_ANALYZER: Agent = _AGENTS["combined_analyzer"]
+
+
 class CompetitiveIntelligenceWorkflow(Workflow):
     description: str = "Analyze competitor GitHub repositories and generate weekly intelligence reports using agno agents."
 
-    data_analyzer: Agent = Agent(
-        name="Data Analyzer",
-        instructions=[
-            "You are a competitive intelligence data analyst.",
-            "Analyze GitHub data for a competitor project including releases and issues.",
-            "Extract key features from releases, identify recurring issue patterns, and categorize problems.",
-            "Focus on actionable insights for product managers.",
-            "IMPORTANT: Always include URLs and links in your analysis:",
-            "- For releases: include the version, description, date, and url from html_url field",
-            "- For issue patterns: include example_links using html_url from relevant issues", 
-            "- Include the repository_url in your response",
-            "Return structured analysis with recent releases, key features, and issue patterns with proper links.",
-            "Be concise and focus on the most important insights with supporting references."
-        ],
-        response_model=CompetitorAnalysis,
-    )
+    # Module-level singletons; each run works on its own copy because agents keep per-run state
+    data_analyzer: Agent = _DATA_ANALYZER
+    report_generator: Agent = _REPORT_GENERATOR
+    combined_analyzer: Agent = _COMBINED_ANALYZER
 
-    report_generator: Agent = Agent(
-        name="Report Generator", 
-        instructions=[
-            "You are a strategic intelligence analyst for product managers.",
-            "Generate comprehensive weekly competitive intelligence reports with source attribution.",
-            "Analyze multiple competitor insights to identify industry trends and strategic opportunities.",
-            "Provide actionable recommendations based on competitive analysis.",
-            "Focus on market positioning, feature gaps, and strategic advantages.",
-            "CRITICAL: Always include sources and references:",
-            "- Populate the 'sources' field with all repository URLs analyzed",
-            "- Include methodology explaining data sources (GitHub releases, issues, etc.)",
-            "- Reference specific releases, issues, or repositories in your trends and recommendations",
-            "- Make industry trends detailed and reference specific competitor findings",
-            "Be concise and focus on the most important strategic insights with complete attribution."
-        ],
-        response_model=WeeklyReport,
-    )
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._tokens = get_github_tokens()
+        self._github_slots = get_github_slots()
+        self._etag_lock = threading.Lock()  # the etag cache is shared by the analysis worker threads
+        self._disk_cache = GitHubDiskCache(GITHUB_CACHE_DIR)
+        self._week_date: Optional[date] = None
+        self._week_key = ""
+        self._http = get_github_client()
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the response should be returned as-is"""
+        if response.status_code in GITHUB_RETRY_STATUSES:
+            return random.uniform(0.5, 1.0) * 0.6 * 2 ** attempt  # jittered exponential backoff
+
+        if response.status_code not in GITHUB_RATE_LIMIT_STATUSES:
+            return None
+        headers = response.headers
+        try:
+            if headers.get("Retry-After"):
+                # Secondary rate limits name the wait explicitly
+                delay = float(headers["Retry-After"])
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                if self._tokens.has_available():
+                    return 0.0  # the pool rotates to a token that still has quota
+                delay = float(headers.get("X-RateLimit-Reset", 0)) - time.time()
+            else:
+                return None  # a plain 403, e.g. a private repository
+        except ValueError:
+            return None
+        return max(delay, 0.0) if delay <= GITHUB_MAX_BACKOFF else None
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a GitHub request, retrying 5xx responses and rate limits per Retry-After / X-RateLimit-Reset"""
+        headers = kwargs.pop("headers", None) or {}
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            token = self._tokens.next_token()
+            auth = {"Authorization": f"token {token}"} if token else {}
+            with self._github_slots:
+                response = self._http.request(method, url, headers={**headers, **auth}, **kwargs)
+            if token:
+                self._tokens.update(token, response.headers)
+            delay = self._retry_delay(response, attempt) if attempt < GITHUB_MAX_RETRIES else None
+            if delay is None:
+                return response
+            logger.warning(f"GitHub returned {response.status_code} for {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def get_github_list(
+        self, url: str, limit: Callable[[List[Dict]], List[Dict]], params: Optional[Dict] = None
+    ) -> List[Dict]:
+        """GET a GitHub list endpoint, revalidating the cached copy with If-None-Match / If-Modified-Since"""
+        # Keyed by the full URL so a validator is only ever sent for the same query (e.g. the same since window)
+        key = str(httpx.URL(url, params=params))
+        with self._etag_lock:
+            etag_cache = self.session_state["etag_cache"] = lru_entries(self.session_state.get("etag_cache"))
+            cached = lru_get(etag_cache, key)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._send("GET", url, headers=headers, params=params)
+        if response.status_code == 304 and cached:
+            # Unchanged since the last fetch: no body transferred and no primary rate limit spent
+            return cached["data"]
+        # Raised rather than returned as [] so st.cache_data never stores a failed fetch
+        response.raise_for_status()
 
-    def get_github_data(self, owner: str, repo: str) -> Dict:
+        data = limit(orjson.loads(response.content))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._etag_lock:
+                lru_put(
+                    self.session_state["etag_cache"],
+                    key,
+                    {"etag": etag, "last_modified": last_modified, "data": data},
+                    maxsize=GITHUB_ETAG_CACHE_SIZE,
+                )
+        return data
+
+    def fetch_github_data(self, owner: str, repo: str, since: str, use_cache: bool = False) -> Dict:
         """Fetch GitHub data using API with reduced data size for AI processing"""
-        token = os.getenv("GITHUB_TOKEN")
-        headers = {"Authorization": f"token {token}"} if token else {}
-        
         releases_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
         issues_url = f"https://api.github.com/repos/{owner}/{repo}/issues"
-        
+
+        # Get recent releases (limit to 3 for token efficiency)
+        limited_releases = self._disk_cache.get(owner, repo, "releases") if use_cache else None
+        if limited_releases is None:
+            limited_releases = self.get_github_list(releases_url, limit_releases, params={"per_page": 3})
+            self._disk_cache.set(owner, repo, "releases", limited_releases)
+
+        # Get recent issues (reduce to 20 for token efficiency)
+        limited_issues = self._disk_cache.get(owner, repo, "issues") if use_cache else None
+        if limited_issues is None:
+            issues_params = {"since": since, "state": "all", "per_page": 20}  # Reduced from 50
+            limited_issues = self.get_github_list(issues_url, limit_issues, params=issues_params)
+            self._disk_cache.set(owner, repo, "issues", limited_issues)
+
+        return {
+            "releases": limited_releases,
+            "issues": limited_issues,
+            "repository_url": f"https://github.com/{owner}/{repo}"  # Add repo URL
+        }
+
+    def get_github_data(
+        self, owner: str, repo: str, since: Optional[str] = None, use_cache: bool = False
+    ) -> Dict:
+        """GitHub data for one repository, served from the Streamlit data cache across reruns"""
         try:
-            # Get recent releases (limit to 3 for token efficiency)
-            releases_response = requests.get(releases_url, headers=headers)
-            releases_data = releases_response.json() if releases_response.status_code == 200 else []
-            
-            # Limit release data to essential fields only, including URLs
-            limited_releases = []
-            for release in releases_data[:3]:  # Only last 3 releases
-                limited_releases.append({
-                    "tag_name": release.get("tag_name", ""),
-                    "name": release.get("name", ""),
-                    "body": release.get("body", "")[:500],  # Limit to 500 chars
-                    "published_at": release.get("published_at", ""),
-                    "html_url": release.get("html_url", "")  # Add release URL
-                })
-            
-            # Get recent issues (reduce to 20 for token efficiency)
-            cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
-            issues_params = {"since": cutoff_date, "state": "all", "per_page": 20}  # Reduced from 50
-            issues_response = requests.get(issues_url, headers=headers, params=issues_params)
-            issues_data = issues_response.json() if issues_response.status_code == 200 else []
-            
-            # Limit issue data to essential fields only, including URLs
-            limited_issues = []
-            for issue in issues_data[:20]:  # Only first 20 issues
-                limited_issues.append({
-                    "title": issue.get("title", ""),
-                    "body": (issue.get("body", "") or "")[:200],  # Limit to 200 chars
-                    "labels": [label.get("name", "") for label in issue.get("labels", [])][:3],  # Max 3 labels
-                    "state": issue.get("state", ""),
-                    "created_at": issue.get("created_at", ""),
-                    "html_url": issue.get("html_url", "")  # Add issue URL
-                })
-            
-            return {
-                "releases": limited_releases,
-                "issues": limited_issues,
-                "repository_url": f"https://github.com/{owner}/{repo}"  # Add repo URL
-            }
+            return _fetch_github(owner, repo, since or github_since(), use_cache, self)
         except Exception as e:
+            # Failures raise through st.cache_data, so they are retried on the next call instead of cached
             logger.error(f"Error fetching data for {owner}/{repo}: {e}")
             return {"releases": [], "issues": [], "repository_url": f"https://github.com/{owner}/{repo}"}
 
-    def analyze_competitor(self, project_name: str, owner: str, repo: str) -> Optional[CompetitorAnalysis]:
+    def get_github_data_batch(
+        self, selected_competitors: Dict, since: Optional[str] = None, use_cache: bool = False
+    ) -> Dict[str, Dict]:
+        """GitHub data for all competitors keyed by project name, served from the Streamlit data cache"""
+        if not self._tokens.tokens or not selected_competitors:
+            # The GraphQL API requires authentication; callers fall back to the REST endpoints
+            return {}
+
+        repositories = tuple(
+            (project_name, config["owner"], config["repo"]) for project_name, config in selected_competitors.items()
+        )
+        try:
+            return _fetch_github_batch(repositories, since or github_since(), use_cache, self)
+        except Exception as e:
+            logger.error(f"Error fetching batched GitHub data: {e}")
+            return {}
+
+    def fetch_github_data_batch(
+        self, repositories: Tuple[Tuple[str, str, str], ...], since: str, use_cache: bool = False
+    ) -> Dict[str, Dict]:
+        """Fetch GitHub data for (project name, owner, repo) entries with a single GraphQL request"""
+        batch = {}
+        if use_cache:
+            # Repositories with both lists still fresh on disk are left out of the query
+            stale = []
+            for project_name, owner, repo in repositories:
+                releases = self._disk_cache.get(owner, repo, "releases")
+                issues = self._disk_cache.get(owner, repo, "issues")
+                if releases is None or issues is None:
+                    stale.append((project_name, owner, repo))
+                    continue
+                batch[project_name] = {
+                    "releases": releases,
+                    "issues": issues,
+                    "repository_url": f"https://github.com/{owner}/{repo}",
+                }
+            repositories = tuple(stale)
+            if not repositories:
+                return batch
+
+        variables: Dict[str, Any] = {"since": since}
+        declarations = ["$since: DateTime"]
+        selections = []
+        aliases = {}
+        for index, (project_name, owner, repo) in enumerate(repositories):
+            alias = f"r{index}"
+            aliases[alias] = (project_name, owner, repo)
+            variables[f"o{index}"] = owner
+            variables[f"n{index}"] = repo
+            declarations += [f"$o{index}: String!", f"$n{index}: String!"]
+            selections.append(f"{alias}: repository(owner: $o{index}, name: $n{index}) {{ ...CompetitorData }}")
+        query = f"query({', '.join(declarations)}) {{ {' '.join(selections)} }}" + GITHUB_REPOSITORY_FRAGMENT
+
+        response = self._send("POST", GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables})
+        response.raise_for_status()
+        payload = orjson.loads(response.content)
+
+        for error in payload.get("errors") or []:
+            logger.warning(f"GitHub GraphQL error: {error.get('message')}")
+
+        data = payload.get("data") or {}
+        for alias, (project_name, owner, repo) in aliases.items():
+            repository = data.get(alias)
+            if not repository:
+                # Missing repositories are left out so they are retried individually over REST
+                continue
+            batch[project_name] = {
+                "releases": limit_graphql_releases(repository["releases"]["nodes"]),
+                "issues": limit_graphql_issues(repository["issues"]["nodes"]),
+                "repository_url": f"https://github.com/{owner}/{repo}",
+            }
+            self._disk_cache.set(owner, repo, "releases", batch[project_name]["releases"])
+            self._disk_cache.set(owner, repo, "issues", batch[project_name]["issues"])
+        return batch
+
+    def analyze_competitor(
+        self,
+        project_name: str,
+        owner: str,
+        repo: str,
+        github_data: Optional[Dict] = None,
+        since: Optional[str] = None,
+        use_cache: bool = False,
+    ) -> Optional[CompetitorAnalysis]:
         """Analyze a single competitor using agno data analyzer agent"""
         try:
             logger.info(f"Starting analysis for {project_name}")
-            github_data = self.get_github_data(owner, repo)
+            if github_data is None:
+                github_data = self.get_github_data(owner, repo, since, use_cache)
             
             if not github_data.get("releases") and not github_data.get("issues"):
                 logger.warning(f"No data found for {project_name}")
                 return None
+
+            # Unchanged GitHub data since the last run means the previous analysis still holds
+            payload_hash = hashlib.blake2b(orjson.dumps(github_data), digest_size=16).hexdigest()
+            payload_hashes = self.session_state.setdefault("payload_hashes", {})
+            previous = payload_hashes.get(project_name)
+            if previous and previous[0] == payload_hash:
+                logger.info(f"GitHub data unchanged for {project_name}, reusing previous analysis")
+                return _ANALYSIS_ADAPTER.validate_python(previous[1])
             
-            analysis_prompt = f"""
-            Analyze competitive intelligence for {project_name} ({owner}/{repo}):
-            
-            Repository URL: {github_data["repository_url"]}
-            
-            Recent Releases: {json.dumps(github_data["releases"])}
-            Recent Issues: {json.dumps(github_data["issues"])}
-            
-            Provide structured analysis with the following requirements:
-            1. Include the repository_url: {github_data["repository_url"]}
-            2. For each recent release, include the version, description, date, and the html_url link
-            3. For recurring issue patterns, include example issue URLs (html_url) for each pattern
-            4. Extract key features and strategic insights
-            
-            IMPORTANT: Include actual URLs from the provided data so users can reference the source material.
-            Format the response according to the CompetitorAnalysis model structure.
-            """
+            # Joined straight from orjson's bytes and decoded once, instead of decoding each dump into an f-string
+            analysis_prompt = b"".join((
+                ANALYSIS_PROMPT_HEADER.format(
+                    project_name=project_name, owner=owner, repo=repo, repository_url=github_data["repository_url"]
+                ).encode(),
+                ANALYSIS_PROMPT_RELEASES, orjson.dumps(github_data["releases"]),
+                ANALYSIS_PROMPT_ISSUES, orjson.dumps(encode_issue_columns(select_signal_issues(github_data["issues"]))),
+                ANALYSIS_PROMPT_LABELS, orjson.dumps(count_issue_labels(github_data["issues"])),
+            )).decode()
             
             logger.info(f"Running AI analysis for {project_name}")
-            response: RunResponse = self.data_analyzer.run(analysis_prompt)
+            # Agents keep per-run state, so each concurrent analysis runs on its own copy
+            data_analyzer = self.data_analyzer.deep_copy()
+            response: RunResponse = data_analyzer.run(analysis_prompt)
             
-            if response and response.content and isinstance(response.content, CompetitorAnalysis):
+            analysis = coerce_response(response.content if response else None, _ANALYSIS_ADAPTER)
+            if analysis:
                 logger.info(f"Successfully analyzed {project_name}")
-                return response.content
+                # Stored as a list so the entry round-trips through JSON session storage unchanged
+                payload_hashes[project_name] = [payload_hash, analysis.model_dump()]
+                return analysis
             else:
                 logger.warning(f"Invalid response format for {project_name}: {type(response.content) if response else 'No response'}")
                 return None
@@ -196,35 +810,35 @@ class CompetitiveIntelligenceWorkflow(Workflow):
                 if hasattr(analysis, 'repository_url') and analysis.repository_url:
                     sources.append(f"{analysis.project_name}: {analysis.repository_url}")
             
-            report_prompt = f"""
-            Generate competitive intelligence report from competitor analyses:
-            
-            Data: {json.dumps([analysis.model_dump() for analysis in analyses])}
-            
-            Provide a structured weekly report with:
-            1. Industry trends across competitors with specific examples
-            2. Strategic recommendations for product management with supporting evidence  
-            3. Competitive threats and opportunities
-            4. Analysis methodology explaining the data sources and approach
-            
-            IMPORTANT: 
-            - Include detailed industry trends that reference specific competitor findings
-            - Ensure all recommendations are backed by specific evidence from the data
-            - Include methodology explaining how this analysis was conducted
-            - Focus on actionable insights for Product Managers
+            # model_dump_json serializes each model in pydantic-core without building intermediate dicts
+            analyses_json = "[" + ",".join(analysis.model_dump_json() for analysis in analyses) + "]"
+
+            # The same analyses (e.g. all reused from unchanged GitHub data) produce the same report
+            report_key = hashlib.blake2b(
+                b"".join(
+                    analysis.model_dump_json().encode()
+                    for analysis in sorted(analyses, key=lambda analysis: analysis.project_name)
+                )
+            ).hexdigest()
+            report_cache = self.session_state["report_cache"] = lru_entries(self.session_state.get("report_cache"))
+            cached_report = lru_get(report_cache, report_key)
+            if cached_report:
+                logger.info("Competitor analyses unchanged, reusing previous weekly report")
+                return _WEEKLY_ADAPTER.validate_python(cached_report)
             
-            Format the response according to the WeeklyReport model structure.
-            """
+            report_prompt = REPORT_PROMPT_PREFIX + analyses_json
             
             logger.info("Running AI report generation")
-            response: RunResponse = self.report_generator.run(report_prompt)
+            response: RunResponse = self.report_generator.deep_copy().run(report_prompt)
             
-            if response and response.content and isinstance(response.content, WeeklyReport):
+            weekly_report = coerce_response(response.content if response else None, _WEEKLY_ADAPTER)
+            if weekly_report:
                 # Ensure sources are populated if not provided by AI
-                if not response.content.sources and sources:
-                    response.content.sources = sources
+                if not weekly_report.sources and sources:
+                    weekly_report.sources = sources
+                lru_put(report_cache, report_key, weekly_report.model_dump())
                 logger.info("Successfully generated weekly report")
-                return response.content
+                return weekly_report
             else:
                 logger.warning(f"Invalid response from report generator: {type(response.content) if response else 'No response'}")
                 return None
@@ -235,18 +849,112 @@ class CompetitiveIntelligenceWorkflow(Workflow):
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return None
 
+    def current_week_key(self) -> str:
+        """Report cache key for the current week, only re-formatted when the date changes"""
+        today = date.today()
+        if today != self._week_date:
+            self._week_date, self._week_key = today, today.strftime("%Y-W%U")
+        return self._week_key
+
+    def get_report_cache(self) -> List[List[Any]]:
+        """Weekly report cache in session state as [week, report] pairs, least recently used first"""
+        reports = self.session_state.get("reports")
+        if reports and isinstance(reports, list) and isinstance(reports[0], dict):
+            # Sessions stored before the cache was keyed by week hold a list of {"week", "data"} entries
+            reports = [[cached_report["week"], cached_report["data"]] for cached_report in reports]
+        self.session_state["reports"] = lru_entries(reports)
+        return self.session_state["reports"]
+
     def get_cached_report(self, week_key: str) -> Optional[WeeklyReport]:
         """Get cached report from session state"""
-        if "reports" in self.session_state:
-            for cached_report in self.session_state["reports"]:
-                if cached_report["week"] == week_key:
-                    return WeeklyReport.model_validate(cached_report["data"])
-        return None
+        cached_report = lru_get(self.get_report_cache(), week_key)
+        return _WEEKLY_ADAPTER.validate_python(cached_report) if cached_report else None
+
+    def generate_combined_report(
+        self,
+        selected_competitors: Dict,
+        github_data: Dict[str, Dict],
+        since: Optional[str] = None,
+        use_cache: bool = False,
+    ) -> Optional[WeeklyReport]:
+        """Analyze every competitor and generate the weekly report in a single agno agent call"""
+        try:
+            logger.info("Starting single-pass competitive analysis")
+
+            competitors_data = {}
+            for project_name, config in selected_competitors.items():
+                project_data = github_data.get(project_name) or self.get_github_data(
+                    config["owner"], config["repo"], since, use_cache
+                )
+                if project_data.get("releases") or project_data.get("issues"):
+                    competitors_data[project_name] = {
+                        **project_data,
+                        "issues": encode_issue_columns(select_signal_issues(project_data["issues"])),
+                        "issue_label_counts": count_issue_labels(project_data["issues"]),
+                    }
+                else:
+                    logger.warning(f"No data found for {project_name}")
+
+            if not competitors_data:
+                return None
+
+            sources = [f"{project_name}: {data['repository_url']}" for project_name, data in competitors_data.items()]
 
-    def run(self, selected_competitors: Dict, use_cache: bool = False) -> RunResponse:
+            report_prompt = (COMBINED_PROMPT_PREFIX + orjson.dumps(competitors_data)).decode()
+
+            logger.info("Running single-pass AI analysis")
+            response: RunResponse = self.combined_analyzer.deep_copy().run(report_prompt)
+
+            weekly_report = coerce_response(response.content if response else None, _WEEKLY_ADAPTER)
+            if weekly_report:
+                if not weekly_report.sources:
+                    weekly_report.sources = sources
+                logger.info("Successfully generated single-pass report")
+                return weekly_report
+            else:
+                logger.warning(f"Invalid response from combined analyzer: {type(response.content) if response else 'No response'}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Error generating single-pass report: {str(e)}")
+            import traceback
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            return None
+
+    def analyze_competitors(
+        self,
+        selected_competitors: Dict,
+        github_data: Dict[str, Dict],
+        since: Optional[str] = None,
+        use_cache: bool = False,
+    ) -> List[CompetitorAnalysis]:
+        """Analyze competitors concurrently - each analysis is dominated by GitHub and LLM round-trips"""
+        results: List[Optional[CompetitorAnalysis]] = [None] * len(selected_competitors)
+        # Bounded so long custom project lists do not open dozens of concurrent LLM requests
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_ANALYSIS_WORKERS, len(selected_competitors)))) as executor:
+            futures = {}
+            for index, (project_name, config) in enumerate(selected_competitors.items()):
+                logger.info(f"Analyzing {project_name} with agno agents...")
+                future = executor.submit(
+                    self.analyze_competitor,
+                    project_name,
+                    config["owner"],
+                    config["repo"],
+                    github_data.get(project_name),
+                    since,
+                    use_cache,
+                )
+                futures[future] = index
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        # Keep the original selection order for display
+        return [analysis for analysis in results if analysis]
+
+    def run(self, selected_competitors: Dict, use_cache: bool = False, single_pass: bool = False) -> RunResponse:
         """Main workflow execution using agno framework"""
         logger.info("Starting agno competitive intelligence analysis...")
-        current_week = datetime.now().strftime("%Y-W%U")
+        current_week = self.current_week_key()
         
         if use_cache:
             cached_report = self.get_cached_report(current_week)
@@ -256,35 +964,36 @@ class CompetitiveIntelligenceWorkflow(Workflow):
                     content=cached_report,
                 )
 
-        # Analyze each competitor using agno agents
-        analyses = []
-        for project_name, config in selected_competitors.items():
-            logger.info(f"Analyzing {project_name} with agno agents...")
-            analysis = self.analyze_competitor(project_name, config["owner"], config["repo"])
-            if analysis:
-                analyses.append(analysis)
+        # One issues window for the whole run, shared by the GraphQL batch and any REST fallbacks
+        since = github_since()
 
-        if not analyses:
-            return RunResponse(
-                run_id=self.run_id,
-                content="No competitor data could be analyzed.",
-            )
+        # Fetch every competitor in one GraphQL round-trip; anything missing falls back to REST per repo
+        # use_cache also serves GitHub lists still within their disk cache TTL instead of refetching them
+        github_data = self.get_github_data_batch(selected_competitors, since, use_cache)
+
+        if single_pass:
+            # One LLM round-trip instead of one per competitor plus the report
+            weekly_report = self.generate_combined_report(selected_competitors, github_data, since, use_cache)
+        else:
+            analyses = self.analyze_competitors(selected_competitors, github_data, since, use_cache)
+
+            if not analyses:
+                return RunResponse(
+                    run_id=self.run_id,
+                    content="No competitor data could be analyzed.",
+                )
+
+            # Generate weekly report using agno agent
+            weekly_report = self.generate_weekly_report(analyses)
 
-        # Generate weekly report using agno agent
-        weekly_report = self.generate_weekly_report(analyses)
         if not weekly_report:
             return RunResponse(
                 run_id=self.run_id,
                 content="Failed to generate weekly report.",
             )
 
-        # Cache report
-        if "reports" not in self.session_state:
-            self.session_state["reports"] = []
-        self.session_state["reports"].append({
-            "week": current_week,
-            "data": weekly_report.model_dump()
-        })
+        # Cache report - agno writes session_state through to storage once run() returns
+        lru_put(self.get_report_cache(), current_week, weekly_report.model_dump())
 
         return RunResponse(
             run_id=self.run_id,
@@ -292,6 +1001,110 @@ class CompetitiveIntelligenceWorkflow(Workflow):
         )
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_github(
+    owner: str, repo: str, since: str, use_cache: bool, _workflow: CompetitiveIntelligenceWorkflow
+) -> Dict:
+    """Per-repository GitHub data shared across reruns; the leading underscore keeps the workflow out of the cache key"""
+    return _workflow.fetch_github_data(owner, repo, since, use_cache)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fetch_github_batch(
+    repositories: Tuple[Tuple[str, str, str], ...],
+    since: str,
+    use_cache: bool,
+    _workflow: CompetitiveIntelligenceWorkflow,
+) -> Dict[str, Dict]:
+    """Batched GitHub data shared across reruns, keyed by the selected (project name, owner, repo) entries"""
+    return _workflow.fetch_github_data_batch(repositories, since, use_cache)
+
+
+@st.cache_resource(show_spinner=False)
+def get_workflow_storage() -> Optional["PostgresStorage"]:
+    """PostgreSQL storage for workflow sessions when USE_DATABASE is enabled, otherwise None"""
+    db_url = os.getenv("DATABASE_URL")
+    if os.getenv("USE_DATABASE", "False").lower() != "true" or not db_url:
+        return None
+    try:
+        # Imported here so sqlalchemy and the Postgres driver only load when persistence is enabled
+        from agno.storage.postgres import PostgresStorage
+
+        return PostgresStorage(table_name="pm_competitive_radar_workflows", db_url=db_url)
+    except Exception as e:
+        logger.warning(f"PostgreSQL storage unavailable, caching in session only: {e}")
+        return None
+
+
+def get_workflow() -> CompetitiveIntelligenceWorkflow:
+    """This browser session's workflow, kept across its reruns.
+
+    agno's run() mutates run_id, run_response and session_state on the instance, so sessions never share one.
+    The expensive parts - storage engine, HTTP client, token pool and agents - are process-wide resources.
+    """
+    if "workflow" not in st.session_state:
+        st.session_state["workflow"] = CompetitiveIntelligenceWorkflow(
+            session_id="pm-competitive-radar",
+            storage=get_workflow_storage(),
+        )
+    return st.session_state["workflow"]
+
+
+GITHUB_LINK_PREFIX = "https://github.com/"
+
+
+def github_anchor(url: Optional[str], label: str) -> str:
+    """A new-tab link when the URL points at github.com over https, else an empty string.
+
+    Links come from the LLM, which reads attacker-controllable release and issue text, and escaping
+    alone would still let a javascript: or data: href through into the unsafe_allow_html block.
+    """
+    if not url or not url.startswith(GITHUB_LINK_PREFIX):
+        return ""
+    return f'<a href="{escape(url)}" target="_blank">{label}</a>'
+
+
+def render_competitor_html(analysis: CompetitorAnalysis) -> str:
+    """Render one competitor tab as a single HTML block - LLM-provided text is escaped, links limited to GitHub"""
+    releases = "".join(
+        f"<details><summary><b>{escape(release.version)}</b> - {escape(release.date)}</summary>"
+        f"<p>{escape(release.description)}</p>"
+        + (f"<p><b>{link}</b></p>" if (link := github_anchor(release.url, "View Release →")) else "")
+        + "</details>"
+        for release in analysis.recent_releases
+    ) or "<p><i>No recent releases</i></p>"
+
+    features = "".join(f"<li>{escape(feature)}</li>" for feature in analysis.key_features)
+
+    repository_link = github_anchor(analysis.repository_url, "View on GitHub →")
+    repository = f"<h3>📁 Repository</h3><p><b>{repository_link}</b></p>" if repository_link else ""
+
+    issue_rows = "".join(
+        f"<tr><td>{escape(issue.pattern)}</td><td>{issue.count} occurrences</td><td>"
+        + " ".join(
+            github_anchor(link, f"Example {i + 1} →")
+            for i, link in enumerate(
+                [link for link in issue.example_links if link.startswith(GITHUB_LINK_PREFIX)][:3]  # Show max 3 examples
+            )
+        )
+        + "</td></tr>"
+        for issue in analysis.recurring_issues
+    )
+    issues = (
+        f"<table><tr><th>Pattern</th><th>Count</th><th>Examples</th></tr>{issue_rows}</table>"
+        if issue_rows else "<p><i>No significant patterns found</i></p>"
+    )
+
+    return (
+        "<p><i>Analysis by agno Data Analyzer Agent</i></p>"
+        '<div style="display: flex; gap: 2rem; flex-wrap: wrap;">'
+        f'<div style="flex: 1; min-width: 18rem;"><h3>🚀 Recent Releases</h3>{releases}'
+        f"<h3>⭐ Key Features</h3><ul>{features}</ul>{repository}</div>"
+        f'<div style="flex: 1; min-width: 18rem;"><h3>🐛 Recurring Issues</h3>{issues}</div>'
+        "</div>"
+    )
+
+
 def display_agno_streamlit_dashboard():
     """Streamlit dashboard using agno competitive intelligence workflow"""
     st.set_page_config(
@@ -314,16 +1127,13 @@ def display_agno_streamlit_dashboard():
         st.info("⚙️ **Configurable Projects**\nCustom or default competitors")
     
     # Check GitHub token
-    github_token = os.getenv("GITHUB_TOKEN")
-    if not github_token:
-        st.error("❌ GitHub token not found! Please set GITHUB_TOKEN in your .env file")
+    if not GitHubTokenPool.from_env().tokens:
+        st.error("❌ GitHub token not found! Please set GITHUB_TOKEN (or GITHUB_TOKENS) in your .env file")
         return
     
-    # Initialize workflow without PostgreSQL
+    # Initialize this session's workflow once, persisting sessions in PostgreSQL when configured
     try:
-        workflow = CompetitiveIntelligenceWorkflow(
-            session_id="pm-competitive-radar"
-        )
+        workflow = get_workflow()
         st.sidebar.success("✅ PM Radar initialized")
     except Exception as e:
         st.error(f"Failed to initialize workflow: {e}")
@@ -410,6 +1220,11 @@ def display_agno_streamlit_dashboard():
         st.sidebar.warning("⚠️ No projects selected")
     
     use_cache = st.sidebar.checkbox("Use Cached Data", value=False)
+    single_pass = st.sidebar.checkbox(
+        "⚡ Single-pass Analysis",
+        value=False,
+        help="Analyze all competitors and write the report in one AI call - faster and cheaper, less detailed per competitor",
+    )
     
     # Analysis button
     if st.sidebar.button("🤖 Run Agno Analysis", type="primary"):
@@ -420,11 +1235,14 @@ def display_agno_streamlit_dashboard():
                 # Run agno workflow following product manager pattern
                 response: RunResponse = workflow.run(
                     selected_competitors=selected_competitors,
-                    use_cache=use_cache
+                    use_cache=use_cache,
+                    single_pass=single_pass,
                 )
                 
                 if response and response.content and isinstance(response.content, WeeklyReport):
                     st.session_state.agno_report = response.content
+                    # Single-pass runs only the Competitive Analyst; otherwise the Data Analyzer and Report Generator
+                    st.session_state.agno_agents_used = 1 if single_pass else 2
                     st.success(f"✅ Agno analysis complete! {len(response.content.analyses)} competitors analyzed.")
                 else:
                     st.error("❌ Agno analysis failed")
@@ -440,7 +1258,7 @@ def display_agno_streamlit_dashboard():
         with col1:
             st.metric("Competitors Analyzed", len(report.analyses))
         with col2:
-            st.metric("AI Agents Used", "2")
+            st.metric("AI Agents Used", str(st.session_state.get("agno_agents_used", 2)))
         
         # Competitor Analysis Section
         st.subheader("🏢 Competitor Analysis (by Agno Agents)")
@@ -451,43 +1269,8 @@ def display_agno_streamlit_dashboard():
             competitor_tabs = st.tabs(competitor_names)
             
             for tab, analysis in zip(competitor_tabs, report.analyses):
-                with tab:
-                    st.markdown(f"*Analysis by agno Data Analyzer Agent*")
-                    
-                    col1, col2 = st.columns([1, 1])
-                    
-                    with col1:
-                        st.markdown("### 🚀 Recent Releases")
-                        if analysis.recent_releases:
-                            for release in analysis.recent_releases:
-                                with st.expander(f"{release.version} - {release.date}"):
-                                    st.write(release.description)
-                                    if hasattr(release, 'url') and release.url:
-                                        st.markdown(f"**[View Release →]({release.url})**")
-                        else:
-                            st.info("No recent releases")
-                        
-                        st.markdown("### ⭐ Key Features")
-                        for feature in analysis.key_features:
-                            st.markdown(f"• {feature}")
-                        
-                        # Add repository link
-                        if hasattr(analysis, 'repository_url') and analysis.repository_url:
-                            st.markdown("### 📁 Repository")
-                            st.markdown(f"**[View on GitHub →]({analysis.repository_url})**")
-                    
-                    with col2:
-                        st.markdown("### 🐛 Recurring Issues")
-                        if analysis.recurring_issues:
-                            for issue in analysis.recurring_issues:
-                                st.metric(label=issue.pattern, value=f"{issue.count} occurrences")
-                                # Show example links if available
-                                if hasattr(issue, 'example_links') and issue.example_links:
-                                    with st.expander(f"Examples for {issue.pattern}"):
-                                        for i, link in enumerate(issue.example_links[:3]):  # Show max 3 examples
-                                            st.markdown(f"[Example {i+1} →]({link})")
-                        else:
-                            st.info("No significant patterns found")
+                # One frontend message per tab instead of one per release, feature and issue widget
+                tab.markdown(render_competitor_html(analysis), unsafe_allow_html=True)
         
         # Strategic Insights Section
         st.markdown("---")
@@ -609,10 +1392,11 @@ def display_agno_streamlit_dashboard():
         st.markdown("**💡 Tip:** Add your competitors' open-source projects to track their development trends!")
 
 
-# Create the agno workflow instance (no PostgreSQL dependency)
-competitive_intelligence = CompetitiveIntelligenceWorkflow(
-    session_id="pm-competitive-radar"
-)
+def __getattr__(name: str) -> Any:
+    """Resolve the agno workflow instance lazily, so importing this module does not connect to storage"""
+    if name == "competitive_intelligence":
+        return get_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Run Streamlit app
 if __name__ == "__main__":
@@ -1,16 +1,219 @@
+import asyncio
+import atexit
+import hashlib
+import itertools
 import os
-import json
-import requests
+import random
+import re
+import threading
+import time
+import httpx
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import streamlit as st
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html import escape
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from agno.agent.agent import Agent
 from agno.run.response import RunEvent, RunResponse
 from agno.storage.postgres import PostgresStorage
 from agno.utils.log import logger
 from agno.workflow.workflow import Workflow
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from sqlalchemy import create_engine
+
+try:
+    # Lower per-task overhead for the GitHub fan-out; only the I/O loop uses it, not Streamlit's own
+    from uvloop import new_event_loop
+except ImportError:
+    from asyncio import new_event_loop
+
+
+# Every competitor's two GitHub calls run at once, so allow plenty of connections to api.github.com
+GITHUB_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+GITHUB_HEADERS = {"Accept": "application/vnd.github+json", "Accept-Encoding": "gzip"}
+GITHUB_CONCURRENCY = int(os.getenv("GH_CONCURRENCY", "8"))
+GITHUB_MAX_RETRIES = 5
+GITHUB_MAX_BACKOFF = 60.0
+# Seconds a cached GitHub response is served without revalidation
+GITHUB_CACHE_TTL = {"releases": 6 * 3600, "issues": 30 * 60}
+
+WORKFLOW_DB_URL = "postgresql+psycopg://ai:ai@localhost:5532/ai"
+
+# A report is never reused past a week, and older weeks are evicted when a new report is cached
+REPORT_CACHE_TTL = 7 * 24 * 3600
+
+GITHUB_API_URL = "https://api.github.com"
+# Paths relative to the client's base_url
+GITHUB_RELEASES_PATH = "/repos/{owner}/{repo}/releases"
+GITHUB_ISSUES_PATH = "/repos/{owner}/{repo}/issues"
+GITHUB_GRAPHQL_PATH = "/graphql"
+# Releases and issues for one repository in a single round trip, asking only for the fields we keep
+GITHUB_GRAPHQL_QUERY = """
+query($owner: String!, $repo: String!, $since: DateTime) {
+  repository(owner: $owner, name: $repo) {
+    releases(first: 5, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { tagName name publishedAt description }
+    }
+    issues(first: 50, states: [OPEN, CLOSED], filterBy: {since: $since}, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { title state createdAt bodyText labels(first: 5) { nodes { name } } }
+    }
+  }
+}
+"""
+
+
+class GitHubTokenPool:
+    """Round-robin over GitHub tokens, skipping any whose rate limit window is exhausted until it resets"""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self._cycle = itertools.cycle(tokens)
+        self._reset_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> "GitHubTokenPool":
+        # Comma-separated GITHUB_TOKENS, falling back to the single GITHUB_TOKEN
+        tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+        if not tokens and os.getenv("GITHUB_TOKEN"):
+            tokens = [os.getenv("GITHUB_TOKEN")]
+        return cls(tokens)
+
+    async def acquire(self) -> Tuple[Optional[str], float]:
+        """Next usable token, and how long to wait first if every token is exhausted"""
+        if not self.tokens:
+            return None, 0.0
+        async with self._lock:
+            now = time.time()
+            for _ in range(len(self.tokens)):
+                token = next(self._cycle)
+                if self._reset_at.get(token, 0) <= now:
+                    return token, 0.0
+            token = min(self.tokens, key=lambda token: self._reset_at[token])
+            return token, self._reset_at[token] - now
+
+    async def update(self, token: Optional[str], headers: httpx.Headers) -> None:
+        if token and headers.get("X-RateLimit-Remaining") == "0":
+            async with self._lock:
+                self._reset_at[token] = float(headers.get("X-RateLimit-Reset") or time.time() + 60)
+
+    def has_available(self) -> bool:
+        now = time.time()
+        return any(self._reset_at.get(token, 0) <= now for token in self.tokens)
+
+
+def _slim_release(release: Dict) -> Dict:
+    """Only the release fields the analyzer reads - raw GitHub objects carry dozens more"""
+    return {
+        "tag_name": release.get("tag_name"),
+        "name": release.get("name"),
+        "published_at": release.get("published_at"),
+        "body": (release.get("body") or "")[:800],
+    }
+
+
+def _slim_issue(issue: Dict) -> Dict:
+    return {
+        "title": issue.get("title"),
+        "state": issue.get("state"),
+        "labels": [label["name"] for label in issue.get("labels", [])],
+        "created_at": issue.get("created_at"),
+        "body": (issue.get("body") or "")[:400],
+    }
+
+
+GITHUB_SLIMMERS = {"releases": _slim_release, "issues": _slim_issue}
+
+
+def _slim_graphql_release(node: Dict) -> Dict:
+    # Same shape as _slim_release so the prompt doesn't depend on which API answered
+    return {
+        "tag_name": node.get("tagName"),
+        "name": node.get("name"),
+        "published_at": node.get("publishedAt"),
+        "body": (node.get("description") or "")[:800],
+    }
+
+
+def _slim_graphql_issue(node: Dict) -> Dict:
+    return {
+        "title": node.get("title"),
+        "state": (node.get("state") or "").lower(),
+        "labels": [label["name"] for label in node.get("labels", {}).get("nodes", [])],
+        "created_at": node.get("createdAt"),
+        "body": (node.get("bodyText") or "")[:400],
+    }
+
+
+ISSUE_TITLE_TOKEN = re.compile(r"[a-z]{4,}")
+ISSUE_TITLE_STOPWORDS = frozenset({
+    "when", "with", "from", "that", "this", "does", "doesn", "into", "after", "before",
+    "should", "using", "have", "only", "being", "while", "cannot", "there", "what", "work",
+})
+
+
+def count_issue_patterns(issues: List[Dict], top_k: int = 10) -> List[Dict]:
+    """Most common issue labels and title keywords, counted here so the LLM only has to describe them"""
+    counts = Counter(label for issue in issues for label in issue["labels"])
+    counts.update(
+        token
+        for issue in issues
+        for token in ISSUE_TITLE_TOKEN.findall((issue["title"] or "").lower())
+        if token not in ISSUE_TITLE_STOPWORDS
+    )
+    return [{"pattern": pattern, "count": count} for pattern, count in counts.most_common(top_k)]
+
+
+def retry_after_seconds(value: str) -> float:
+    """Seconds to wait per a Retry-After header, which RFC 9110 allows as delay-seconds or an HTTP-date"""
+    try:
+        return float(value)
+    except ValueError:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+
+
+class GitHubIO:
+    """Event loop on a daemon thread owning the GitHub client, concurrency cap, token pool and in-flight calls.
+
+    asyncio.run() would start a fresh loop per report, and loop-bound objects (pooled connections,
+    the semaphore, shared futures) can't outlive it - one long-lived loop lets every run reuse them.
+    """
+
+    def __init__(self):
+        self.loop = new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="github-io", daemon=True).start()
+        # HTTP/2 multiplexes every concurrent GitHub request over one TLS connection
+        self.client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=GITHUB_HEADERS,
+            timeout=20.0,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=GITHUB_LIMITS,
+                retries=GITHUB_MAX_RETRIES,  # connection errors only
+            ),
+        )
+        self.semaphore = asyncio.Semaphore(GITHUB_CONCURRENCY)
+        self.tokens = GitHubTokenPool.from_env()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        atexit.register(self.close)
+
+    def run(self, coro: Awaitable):
+        """Run a coroutine on the I/O loop and block the calling thread until it finishes"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self) -> None:
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+@st.cache_resource(show_spinner=False)
+def get_github_io() -> GitHubIO:
+    return GitHubIO()
 
 
 class Release(BaseModel):
@@ -32,6 +235,10 @@ class CompetitorAnalysis(BaseModel):
     recurring_issues: List[IssuePattern] = Field(..., description="Common issue patterns")
 
 
+class CompetitiveAnalysesList(BaseModel):
+    analyses: List[CompetitorAnalysis] = Field(..., description="One analysis per competitor")
+
+
 class WeeklyReport(BaseModel):
     report_date: str = Field(..., description="Report date")
     analyses: List[CompetitorAnalysis] = Field(..., description="Competitor analyses")
@@ -39,17 +246,39 @@ class WeeklyReport(BaseModel):
     recommendations: List[str] = Field(..., description="Strategic recommendations")
 
 
+# Serializes the whole list in one pydantic-core call instead of a model_dump() per analysis
+_ANALYSES_ADAPTER = TypeAdapter(List[CompetitorAnalysis])
+# Validators are compiled once at import and reused for every agent response
+_ANALYSES_LIST_ADAPTER = TypeAdapter(CompetitiveAnalysesList)
+_WEEKLY_ADAPTER = TypeAdapter(WeeklyReport)
+
+
+def coerce_response(content: Any, adapter: TypeAdapter) -> Optional[BaseModel]:
+    """Typed agent output, also accepting the JSON text or dict agno falls back to when parsing fails"""
+    try:
+        if isinstance(content, (str, bytes)):
+            return adapter.validate_json(content)
+        if isinstance(content, (BaseModel, dict)):
+            # validate_python passes an instance of the adapter's model straight through
+            return adapter.validate_python(content)
+    except ValidationError as e:
+        logger.warning(f"Agent response failed validation: {e}")
+    return None
+
+
 class CompetitiveIntelligenceWorkflow(Workflow):
     description: str = "Analyze competitor GitHub repositories and generate weekly intelligence reports."
 
     data_analyzer: Agent = Agent(
         name="Data Analyzer",
         instructions=[
-            "Analyze GitHub data for a competitor project including releases and issues.",
+            "Analyze GitHub data for each competitor project including releases and issues.",
             "Extract key features from releases and identify recurring issue patterns.",
+            "Base recurring_issues on the precomputed issue_patterns counts: group and describe them, keep the counts.",
+            "Return one analysis per competitor, using the competitor name given as its project_name.",
             "Summarize the data in a structured format."
         ],
-        response_model=CompetitorAnalysis,
+        response_model=CompetitiveAnalysesList,
     )
 
     report_generator: Agent = Agent(
@@ -62,65 +291,204 @@ class CompetitiveIntelligenceWorkflow(Workflow):
         response_model=WeeklyReport,
     )
 
-    def get_github_data(self, owner: str, repo: str) -> Dict:
-        token = os.getenv("GITHUB_TOKEN")
-        headers = {"Authorization": f"token {token}"} if token else {}
-        
-        releases_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
-        issues_url = f"https://api.github.com/repos/{owner}/{repo}/issues"
+    async def github_request(
+        self, client: httpx.AsyncClient, method: str, url: str, headers: Optional[Dict] = None, **kwargs
+    ) -> httpx.Response:
+        """Call GitHub under the concurrency cap, backing off on rate limits and transient errors"""
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            # With every token exhausted, wait for the earliest reset instead of burning a 403
+            token, wait = await self._gh_tokens.acquire()
+            if wait > 0:
+                await asyncio.sleep(min(wait, GITHUB_MAX_BACKOFF))
+            auth = {"Authorization": f"token {token}"} if token else {}
+
+            async with self._gh_sem:
+                response = await client.request(method, url, headers={**(headers or {}), **auth}, **kwargs)
+            await self._gh_tokens.update(token, response.headers)
+
+            delay = None
+            backoff = 0.5 * 2 ** attempt + random.uniform(0, 0.5)
+            if response.status_code in (403, 429):
+                try:
+                    if response.headers.get("Retry-After"):
+                        delay = retry_after_seconds(response.headers["Retry-After"])
+                    elif response.headers.get("X-RateLimit-Remaining") == "0":
+                        # Another token may still have quota; otherwise wait for this one's window
+                        reset = float(response.headers.get("X-RateLimit-Reset") or 0)
+                        delay = 0.0 if self._gh_tokens.has_available() else reset - time.time()
+                except (TypeError, ValueError):
+                    # A malformed header shouldn't abort the whole gather; back off as for a 5xx
+                    delay = backoff
+            elif response.status_code in (502, 503, 504):
+                delay = backoff
+
+            if delay is None or delay > GITHUB_MAX_BACKOFF or attempt == GITHUB_MAX_RETRIES:
+                return response
+            logger.warning(f"GitHub returned {response.status_code} for {url}, retrying in {delay:.1f}s")
+            await asyncio.sleep(max(delay, 0))
+
+    async def get_github_json(
+        self, client: httpx.AsyncClient, url: str, kind: str, params: Optional[Dict] = None
+    ) -> List[Dict]:
+        """GitHub list response from the session cache while fresh, revalidated with If-None-Match once stale"""
+        # agno writes session_state to the workflow storage once run() returns, so the cache outlives a restart
+        cache = self.session_state.setdefault("github_cache", {})
+        # Keyed by the query too, so a result for one since window is never served for another
+        key = str(httpx.URL(url, params=sorted((params or {}).items())))
+        entry = cache.get(key)
+        if entry and time.time() - entry["fetched_at"] < GITHUB_CACHE_TTL[kind]:
+            return entry["data"]
+
+        headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else {}
+        response = await self.github_request(client, "GET", url, headers=headers, params=params)
+        if response.status_code == 304 and entry:
+            # Unchanged: no body transferred and no primary rate limit spent
+            entry["fetched_at"] = time.time()
+            return entry["data"]
+        if response.status_code != 200:
+            return []
+
+        # Slimmed before caching so the persisted session stays small too
+        data = [GITHUB_SLIMMERS[kind](item) for item in orjson.loads(response.content)]
+        self.put_github_cache(key, {"etag": response.headers.get("ETag"), "data": data})
+        return data
+
+    def put_github_cache(self, key: str, entry: Dict) -> None:
+        """Store a GitHub result, dropping expired entries so past since windows don't pile up in the session"""
+        cache = self.session_state.setdefault("github_cache", {})
+        now = time.time()
+        max_ttl = max(GITHUB_CACHE_TTL.values())
+        for stale_key in [k for k, cached in cache.items() if now - cached["fetched_at"] >= max_ttl]:
+            del cache[stale_key]
+        cache[key] = {"fetched_at": now, **entry}
+
+    async def coalesce(self, key: str, make_call: Callable[[], Awaitable]):
+        """Run make_call once per key, with concurrent callers for the same key awaiting the shared result"""
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(make_call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so one caller being cancelled doesn't cancel the call for everyone else
+        return await asyncio.shield(future)
+
+    async def get_github_data(self, client: httpx.AsyncClient, owner: str, repo: str, since: str) -> Dict:
+        return await self.coalesce(
+            f"github:{owner}/{repo}", lambda: self.fetch_github_data(client, owner, repo, since)
+        )
+
+    async def fetch_github_graphql(
+        self, client: httpx.AsyncClient, owner: str, repo: str, since: str
+    ) -> Optional[Dict]:
+        """Releases and issues in one GraphQL query, or None so the caller falls back to REST"""
+        # No ETags on GraphQL POSTs, so the whole result shares the shorter issues TTL
+        cache = self.session_state.setdefault("github_cache", {})
+        key = f"graphql:{owner}/{repo}:{since}"
+        entry = cache.get(key)
+        if entry and time.time() - entry["fetched_at"] < GITHUB_CACHE_TTL["issues"]:
+            return entry["data"]
+
+        response = await self.github_request(
+            client,
+            "POST",
+            GITHUB_GRAPHQL_PATH,
+            json={"query": GITHUB_GRAPHQL_QUERY, "variables": {"owner": owner, "repo": repo, "since": since}},
+        )
+        if response.status_code != 200:
+            return None
+        repository = (orjson.loads(response.content).get("data") or {}).get("repository")
+        if not repository:
+            return None
+
+        data = {
+            "releases": [_slim_graphql_release(node) for node in repository["releases"]["nodes"]],
+            "issues": [_slim_graphql_issue(node) for node in repository["issues"]["nodes"]],
+        }
+        self.put_github_cache(key, {"data": data})
+        return data
+
+    async def fetch_github_data(self, client: httpx.AsyncClient, owner: str, repo: str, since: str) -> Dict:
+        releases_url = GITHUB_RELEASES_PATH.format(owner=owner, repo=repo)
+        issues_url = GITHUB_ISSUES_PATH.format(owner=owner, repo=repo)
         
         try:
-            # Get recent releases
-            releases_response = requests.get(releases_url, headers=headers)
-            releases_data = releases_response.json() if releases_response.status_code == 200 else []
-            
-            # Get recent issues
-            cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
-            issues_params = {"since": cutoff_date, "state": "all", "per_page": 50}
-            issues_response = requests.get(issues_url, headers=headers, params=issues_params)
-            issues_data = issues_response.json() if issues_response.status_code == 200 else []
-            
-            return {
-                "releases": releases_data[:5],  # Last 5 releases
-                "issues": issues_data
-            }
+            # GraphQL needs a token; without one (or if it fails) use the two REST endpoints
+            github_data = None
+            if self._gh_tokens.tokens:
+                github_data = await self.fetch_github_graphql(client, owner, repo, since)
+
+            if github_data is None:
+                # Get recent releases and issues concurrently
+                issues_params = {"since": since, "state": "all", "per_page": 50}
+                releases_data, issues_data = await asyncio.gather(
+                    # GitHub would otherwise send 30 full releases only for us to keep 5
+                    self.get_github_json(client, releases_url, "releases", params={"per_page": 5}),
+                    self.get_github_json(client, issues_url, "issues", params=issues_params),
+                )
+                github_data = {
+                    "releases": releases_data,  # Last 5 releases
+                    "issues": issues_data
+                }
+
+            # Deterministic counts instead of asking the LLM to tally 50 issues
+            return {**github_data, "issue_patterns": count_issue_patterns(github_data["issues"])}
         except Exception as e:
             logger.error(f"Error fetching data for {owner}/{repo}: {e}")
-            return {"releases": [], "issues": []}
+            return {"releases": [], "issues": [], "issue_patterns": []}
 
-    def analyze_competitor(self, project_name: str, owner: str, repo: str) -> Optional[CompetitorAnalysis]:
-        github_data = self.get_github_data(owner, repo)
-        
+    async def analyze_competitors(self, competitors_data: Dict[str, Dict]) -> List[CompetitorAnalysis]:
+        return await self.coalesce(
+            f"analysis:{','.join(sorted(competitors_data))}",
+            lambda: self.run_competitor_analyses(competitors_data),
+        )
+
+    async def run_competitor_analyses(self, competitors_data: Dict[str, Dict]) -> List[CompetitorAnalysis]:
+        # One LLM round trip for every competitor instead of one each, sharing the instruction prompt
         analysis_prompt = f"""
-        Analyze competitor: {project_name}
-        GitHub data: {json.dumps(github_data)}
+        Analyze competitors: {', '.join(competitors_data)}
+        GitHub data by competitor: {orjson.dumps(competitors_data).decode()}
         
-        Extract key insights about recent releases and common issues.
+        Extract key insights about recent releases and common issues for each competitor.
         """
         
         try:
-            response: RunResponse = self.data_analyzer.run(analysis_prompt)
-            if response and response.content and isinstance(response.content, CompetitorAnalysis):
-                return response.content
+            # Agents keep per-run state (run_id, run_response, memory) and are shared by every workflow instance
+            response: RunResponse = await self.data_analyzer.deep_copy().arun(analysis_prompt)
+            analyses = coerce_response(response.content, _ANALYSES_LIST_ADAPTER) if response else None
+            if analyses:
+                return analyses.analyses
             else:
-                logger.warning(f"Invalid response for {project_name}")
-                return None
+                logger.warning("Invalid analysis response")
+                return []
         except Exception as e:
-            logger.error(f"Error analyzing {project_name}: {e}")
-            return None
+            logger.error(f"Error analyzing competitors: {e}")
+            return []
+
+    async def _run_async(self, competitors: Dict, github_io: GitHubIO, since: str) -> List[CompetitorAnalysis]:
+        # Shared across runs and sessions, so rate limits and duplicate in-flight calls are process-wide
+        self._gh_sem = github_io.semaphore
+        self._gh_tokens = github_io.tokens
+        self._in_flight = github_io.in_flight
+
+        client = github_io.client
+        github_data = await asyncio.gather(
+            *(self.get_github_data(client, config["owner"], config["repo"], since) for config in competitors.values())
+        )
+        return await self.analyze_competitors(dict(zip(competitors, github_data)))
 
     def generate_weekly_report(self, analyses: List[CompetitorAnalysis]) -> Optional[WeeklyReport]:
         report_prompt = f"""
         Generate weekly competitive intelligence report.
-        Competitor analyses: {json.dumps([a.model_dump() for a in analyses])}
+        Competitor analyses: {_ANALYSES_ADAPTER.dump_json(analyses).decode()}
         
         Identify trends and provide strategic recommendations.
         """
         
         try:
-            response: RunResponse = self.report_generator.run(report_prompt)
-            if response and response.content and isinstance(response.content, WeeklyReport):
-                return response.content
+            response: RunResponse = self.report_generator.deep_copy().run(report_prompt)
+            weekly_report = coerce_response(response.content, _WEEKLY_ADAPTER) if response else None
+            if weekly_report:
+                return weekly_report
             else:
                 logger.warning("Invalid report response")
                 return None
@@ -128,21 +496,29 @@ class CompetitiveIntelligenceWorkflow(Workflow):
             logger.error(f"Error generating report: {e}")
             return None
 
-    def get_cached_report(self, week_key: str) -> Optional[WeeklyReport]:
-        if "reports" in self.session_state:
-            for cached_report in self.session_state["reports"]:
-                if cached_report["week"] == week_key:
-                    return WeeklyReport.model_validate(cached_report["data"])
+    @staticmethod
+    def report_cache_key(week_key: str, competitors: Dict) -> str:
+        # A changed competitor list must not be served the report for the old one
+        digest = hashlib.blake2b(repr(sorted(competitors.items())).encode(), digest_size=8).hexdigest()
+        return f"{week_key}:{digest}"
+
+    def get_report_cache(self) -> Dict[str, Dict]:
+        reports = self.session_state.get("reports")
+        if not isinstance(reports, dict):
+            # Sessions saved before reports were keyed held a list; start over rather than migrate
+            reports = self.session_state["reports"] = {}
+        return reports
+
+    def get_cached_report(self, cache_key: str) -> Optional[WeeklyReport]:
+        cached_report = self.get_report_cache().get(cache_key)
+        if cached_report and time.time() - cached_report["created_at"] < REPORT_CACHE_TTL:
+            return _WEEKLY_ADAPTER.validate_python(cached_report["data"])
         return None
 
-    def run(self, use_cache: bool = False) -> Optional[WeeklyReport]:
+    def run(self, use_cache: bool = False) -> RunResponse:
+        """Weekly report as the RunResponse content (None on failure); agno discards any other return type"""
         logger.info("Starting competitive intelligence analysis...")
         current_week = datetime.now().strftime("%Y-W%U")
-        
-        if use_cache:
-            cached_report = self.get_cached_report(current_week)
-            if cached_report:
-                return cached_report
 
         # Competitor projects to analyze
         competitors = {
@@ -152,34 +528,130 @@ class CompetitiveIntelligenceWorkflow(Workflow):
             "Remix": {"owner": "remix-run", "repo": "remix"},
             "Astro": {"owner": "withastro", "repo": "astro"}
         }
+        cache_key = self.report_cache_key(current_week, competitors)
+        
+        if use_cache:
+            cached_report = self.get_cached_report(cache_key)
+            if cached_report:
+                return RunResponse(run_id=self.run_id, content=cached_report)
 
-        # Analyze each competitor
-        analyses = []
-        for project_name, config in competitors.items():
-            logger.info(f"Analyzing {project_name}...")
-            analysis = self.analyze_competitor(project_name, config["owner"], config["repo"])
-            if analysis:
-                analyses.append(analysis)
+        # Analyze all competitors concurrently; the Streamlit callback stays synchronous
+        logger.info(f"Analyzing {', '.join(competitors)}...")
+        github_io = get_github_io()
+        # One timezone-aware cutoff for every competitor; a naive local time is ambiguous to GitHub.
+        # Floored to the hour so cached GitHub results, keyed by the window, are reused within it
+        cutoff = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=7)
+        since = cutoff.isoformat()
+        analyses = github_io.run(self._run_async(competitors, github_io, since))
 
         if not analyses:
             logger.error("No competitor data could be analyzed.")
-            return None
+            return RunResponse(run_id=self.run_id, content=None)
 
         # Generate weekly report
         weekly_report = self.generate_weekly_report(analyses)
         if not weekly_report:
             logger.error("Failed to generate weekly report.")
-            return None
+            return RunResponse(run_id=self.run_id, content=None)
+
+        # Cache report, dropping entries past their TTL so old weeks don't accumulate
+        reports = self.get_report_cache()
+        now = time.time()
+        for key in [key for key, cached in reports.items() if now - cached["created_at"] >= REPORT_CACHE_TTL]:
+            del reports[key]
+        reports[cache_key] = {"created_at": now, "data": weekly_report.model_dump()}
 
-        # Cache report
-        if "reports" not in self.session_state:
-            self.session_state["reports"] = []
-        self.session_state["reports"].append({
-            "week": current_week,
-            "data": weekly_report.model_dump()
-        })
+        return RunResponse(run_id=self.run_id, content=weekly_report)
 
-        return weekly_report
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_competitor_markdown(analysis: Dict) -> str:
+    """One competitor tab as a single HTML block, cached so reruns skip rebuilding it - LLM text is escaped"""
+    releases = "".join(
+        f"<details><summary><b>{escape(release['version'])}</b> - {escape(release['date'])}</summary>"
+        f"<p>{escape(release['description'])}</p></details>"
+        for release in analysis["recent_releases"]
+    ) or "<p><i>No recent releases</i></p>"
+
+    features = "".join(f"<li>{escape(feature)}</li>" for feature in analysis["key_features"])
+
+    issues = "".join(
+        f"<tr><td>{escape(issue['pattern'])}</td><td>{issue['count']} occurrences</td></tr>"
+        for issue in analysis["recurring_issues"]
+    )
+    issues = (
+        f"<table><tr><th>Pattern</th><th>Count</th></tr>{issues}</table>"
+        if issues else "<p><i>No significant patterns found</i></p>"
+    )
+
+    return (
+        '<div style="display: flex; gap: 2rem; flex-wrap: wrap;">'
+        f'<div style="flex: 1; min-width: 18rem;"><h3>🚀 Recent Releases</h3>{releases}'
+        f"<h3>⭐ Key Features</h3><ul>{features}</ul></div>"
+        f'<div style="flex: 1; min-width: 18rem;"><h3>🐛 Recurring Issues</h3>{issues}</div>'
+        "</div>"
+    )
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_trends_markdown(industry_trends: List[str], recommendations: List[str]) -> Tuple[str, str]:
+    return (
+        "### 🎯 Key Trends\n" + "\n".join(f"- {trend}" for trend in industry_trends),
+        "### 💡 Recommendations\n" + "\n".join(f"- {rec}" for rec in recommendations),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_workflow_storage() -> PostgresStorage:
+    """Workflow storage shared by every session, so reruns and clicks reuse one pooled Postgres engine"""
+    engine = create_engine(WORKFLOW_DB_URL, pool_size=4, max_overflow=4, pool_pre_ping=True)
+    return PostgresStorage(table_name="competitive_intelligence_workflows", db_engine=engine)
+
+
+def get_workflow() -> CompetitiveIntelligenceWorkflow:
+    """This browser session's workflow; agno's run() mutates run state on the instance, so sessions never share one"""
+    if "workflow" not in st.session_state:
+        st.session_state.workflow = CompetitiveIntelligenceWorkflow(
+            session_id="competitive-intelligence",
+            storage=get_workflow_storage(),
+        )
+    return st.session_state.workflow
+
+
+def start_report_generation(use_cache: bool, notify: bool) -> None:
+    """Run the workflow on this session's worker thread so the script keeps rendering meanwhile"""
+    if "report_future" in st.session_state:
+        return  # a report is already being generated
+    if "executor" not in st.session_state:
+        st.session_state.executor = ThreadPoolExecutor(max_workers=1)
+
+    st.session_state.report_future = st.session_state.executor.submit(get_workflow().run, use_cache=use_cache)
+    st.session_state.report_notify = notify
+
+
+@st.fragment(run_every=1.0)
+def poll_report_generation() -> None:
+    """Re-run every second until the background report finishes, then rerun the page to show it"""
+    future = st.session_state.report_future
+    if not future.done():
+        st.info("⏳ Analyzing competitors...")
+        return
+
+    del st.session_state.report_future
+    st.session_state.report_attempted = True
+    try:
+        response = future.result()
+        report = response.content if response else None
+    except Exception as e:
+        logger.error(f"Error generating report: {e}")
+        report = None
+    if report:
+        st.session_state.current_report = report
+    if st.session_state.report_notify:
+        st.session_state.report_message = (
+            ("success", "✅ Report generated successfully!") if report else ("error", "❌ Failed to generate report")
+        )
+    st.rerun()
 
 
 def display_streamlit_dashboard():
@@ -197,39 +669,19 @@ def display_streamlit_dashboard():
     st.sidebar.title("Controls")
     
     if st.sidebar.button("🔄 Generate New Report", type="primary"):
-        with st.spinner("Analyzing competitors..."):
-            # Initialize workflow
-            workflow = CompetitiveIntelligenceWorkflow(
-                session_id="competitive-intelligence",
-                storage=PostgresStorage(
-                    table_name="competitive_intelligence_workflows",
-                    db_url="postgresql+psycopg://ai:ai@localhost:5532/ai",
-                ),
-            )
-            
-            # Run analysis
-            report = workflow.run(use_cache=False)
-            if report:
-                st.session_state.current_report = report
-                st.success("✅ Report generated successfully!")
-            else:
-                st.error("❌ Failed to generate report")
+        start_report_generation(use_cache=False, notify=True)
     
     use_cache = st.sidebar.checkbox("Use Cached Data", value=True)
     
-    # Load or generate report
-    if 'current_report' not in st.session_state:
-        with st.spinner("Loading competitive intelligence data..."):
-            workflow = CompetitiveIntelligenceWorkflow(
-                session_id="competitive-intelligence",
-                storage=PostgresStorage(
-                    table_name="competitive_intelligence_workflows",
-                    db_url="postgresql+psycopg://ai:ai@localhost:5532/ai",
-                ),
-            )
-            report = workflow.run(use_cache=use_cache)
-            if report:
-                st.session_state.current_report = report
+    # Load or generate report once per session; a failed load waits for the button
+    if 'current_report' not in st.session_state and not st.session_state.get('report_attempted'):
+        start_report_generation(use_cache=use_cache, notify=False)
+    
+    if 'report_future' in st.session_state:
+        poll_report_generation()
+    elif 'report_message' in st.session_state:
+        level, message = st.session_state.pop('report_message')
+        getattr(st, level)(message)
     
     # Display report if available
     if 'current_report' in st.session_state:
@@ -249,59 +701,29 @@ def display_streamlit_dashboard():
         competitor_tabs = st.tabs([analysis.project_name for analysis in report.analyses])
         
         for tab, analysis in zip(competitor_tabs, report.analyses):
-            with tab:
-                col1, col2 = st.columns([1, 1])
-                
-                with col1:
-                    st.markdown("### 🚀 Recent Releases")
-                    if analysis.recent_releases:
-                        for release in analysis.recent_releases:
-                            with st.expander(f"{release.version} - {release.date}"):
-                                st.write(release.description)
-                    else:
-                        st.info("No recent releases")
-                    
-                    st.markdown("### ⭐ Key Features")
-                    for feature in analysis.key_features:
-                        st.markdown(f"• {feature}")
-                
-                with col2:
-                    st.markdown("### 🐛 Recurring Issues")
-                    if analysis.recurring_issues:
-                        for issue in analysis.recurring_issues:
-                            st.metric(issue.pattern, issue.count, label="occurrences")
-                    else:
-                        st.info("No significant patterns found")
+            tab.markdown(build_competitor_markdown(analysis.model_dump()), unsafe_allow_html=True)
         
         # Industry Trends Section
         st.markdown("---")
         st.subheader("📈 Industry Trends")
         
         col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            st.markdown("### 🎯 Key Trends")
-            for trend in report.industry_trends:
-                st.markdown(f"• {trend}")
-        
-        with col2:
-            st.markdown("### 💡 Recommendations")
-            for rec in report.recommendations:
-                st.markdown(f"• {rec}")
+        trends_markdown, recommendations_markdown = build_trends_markdown(
+            report.industry_trends, report.recommendations
+        )
+        col1.markdown(trends_markdown)
+        col2.markdown(recommendations_markdown)
     
     else:
         st.warning("⚠️ No report data available. Click 'Generate New Report' to start analysis.")
-        st.info("Make sure your GitHub token is configured: `export GITHUB_TOKEN=your_token`")
+        st.info("Make sure your GitHub token is configured: `export GITHUB_TOKEN=your_token` (or comma-separated `GITHUB_TOKENS`)")
 
 
-# Create the workflow
-competitive_intelligence = CompetitiveIntelligenceWorkflow(
-    session_id="competitive-intelligence",
-    storage=PostgresStorage(
-        table_name="competitive_intelligence_workflows",
-        db_url="postgresql+psycopg://ai:ai@localhost:5532/ai",
-    ),
-)
+def __getattr__(name: str) -> Any:
+    """Resolve the workflow instance lazily, so importing this module does not connect to storage"""
+    if name == "competitive_intelligence":
+        return get_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Run Streamlit app
 if __name__ == "__main__":
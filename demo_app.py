@@ -160,15 +160,16 @@ def display_streamlit_dashboard():
                     else:
                         st.info("No recent releases")
                     
-                    st.markdown("### ⭐ Key Features")
-                    for feature in analysis['key_features']:
-                        st.markdown(f"• {feature}")
+                    # One markdown element per section rather than one per bullet
+                    st.markdown("### ⭐ Key Features\n" + "\n".join(f"- {feature}" for feature in analysis['key_features']))
                 
                 with col2:
                     st.markdown("### 🐛 Recurring Issues")
                     if analysis['recurring_issues']:
-                        for issue in analysis['recurring_issues']:
-                            st.metric(issue['pattern'], issue['count'], label="occurrences")
+                        st.markdown("\n".join(
+                            f"- **{issue['pattern']}**: {issue['count']} occurrences"
+                            for issue in analysis['recurring_issues']
+                        ))
                     else:
                         st.info("No significant patterns found")
         
@@ -179,14 +180,10 @@ def display_streamlit_dashboard():
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            st.markdown("### 🎯 Key Trends")
-            for trend in report['industry_trends']:
-                st.markdown(f"• {trend}")
+            st.markdown("### 🎯 Key Trends\n" + "\n".join(f"- {trend}" for trend in report['industry_trends']))
         
         with col2:
-            st.markdown("### 💡 Recommendations")
-            for rec in report['recommendations']:
-                st.markdown(f"• {rec}")
+            st.markdown("### 💡 Recommendations\n" + "\n".join(f"- {rec}" for rec in report['recommendations']))
     
     else:
         st.warning("⚠️ No report data available. Click 'Generate New Report' to start analysis.")
@@ -1,90 +1,343 @@
 import os
-import json
-import requests
+import atexit
+import threading
+import time
+import httpx
+import orjson
 import streamlit as st
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import chain
 import re
 
-# Load environment variables
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 from dotenv import load_dotenv
-load_dotenv()
 
-def get_github_data(owner: str, repo: str) -> Dict:
-    """Fetch real GitHub data using the API"""
-    token = os.getenv("GITHUB_TOKEN")
-    headers = {"Authorization": f"token {token}"} if token else {}
+# Keyword sets and patterns for the release/issue analysis, built once instead of per item
+# Only words longer than 4 characters are counted, so the length filter runs inside the regex engine
+_LONG_WORD_RE = re.compile(r'\b\w{5,}\b')
+_RELEASE_FEATURE_WORDS = frozenset({"feature", "new", "add", "implement"})
+_BREAKING_WORDS = frozenset({"breaking", "deprecated", "removed"})
+_BUG_LABELS = frozenset({"bug", "error", "crash", "problem"})
+_BUG_WORDS = frozenset({"bug", "error", "crash", "issue", "problem", "broken"})
+_FEATURE_LABELS = frozenset({"enhancement", "feature", "request"})
+_FEATURE_WORDS = frozenset({"feature", "request", "enhancement", "add", "support"})
+_STOP_WORDS = frozenset({"issue", "error", "problem"})
+
+def _keyword_matcher(categories: Dict[str, FrozenSet[str]]) -> Callable[[str], FrozenSet[str]]:
+    """Function returning which categories have a keyword occurring (as a substring) in a text, in one scan.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, otherwise one regex alternation per category.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword in set().union(*categories.values()):
+            automaton.add_word(keyword, frozenset(name for name, words in categories.items() if keyword in words))
+        automaton.make_automaton()
+        return lambda text: frozenset().union(*(found for _, found in automaton.iter(text)))
+    
+    patterns = {name: re.compile("|".join(map(re.escape, sorted(words)))) for name, words in categories.items()}
+    return lambda text: frozenset(name for name, pattern in patterns.items() if pattern.search(text))
+
+_match_release_line = _keyword_matcher({"feature": _RELEASE_FEATURE_WORDS, "breaking": _BREAKING_WORDS})
+_match_issue_title = _keyword_matcher({"bug": _BUG_WORDS, "feature": _FEATURE_WORDS})
+
+GITHUB_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+GITHUB_MAX_RETRIES = 3
+GITHUB_MAX_BACKOFF = 60.0
+# Upper bound on 100-issue pages followed for one week's window on very busy repositories
+GITHUB_MAX_ISSUE_PAGES = 3
+# Conditional-request entries kept; the hourly issues window moves on, so older entries age out
+GITHUB_ETAG_CACHE_SIZE = 128
+
+class GitHubAPIError(Exception):
+    """A GitHub fetch failed; raised out of the st.cache_data functions so a failure is retried, never cached"""
+
+@st.cache_resource(show_spinner=False)
+def _env() -> Optional[str]:
+    """Load environment variables once per process; Streamlit reruns would otherwise re-read .env every time"""
+    load_dotenv()
+    return os.getenv("GITHUB_TOKEN")
+
+_GITHUB_TOKEN = _env()
+_BASE_HEADERS = {"Accept": "application/vnd.github+json"}
+if _GITHUB_TOKEN:
+    _BASE_HEADERS["Authorization"] = f"token {_GITHUB_TOKEN}"
+
+def _warm_github_connection(client: httpx.Client) -> None:
+    # /rate_limit doesn't count against the rate limit, so it's a free way to open the TLS connection early
+    try:
+        client.get("https://api.github.com/rate_limit")
+    except httpx.HTTPError:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def get_github_client() -> httpx.Client:
+    """One HTTP/2 client per process: concurrent requests multiplex over a single TLS connection.
+
+    The connection is opened on a background thread at startup so the first Analyze click doesn't wait for it.
+    """
+    client = httpx.Client(
+        headers=_BASE_HEADERS,
+        timeout=10.0,
+        transport=httpx.HTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            retries=GITHUB_MAX_RETRIES,  # connection errors only; status retries are in _github_request
+        ),
+    )
+    atexit.register(client.close)
+    threading.Thread(target=_warm_github_connection, args=(client,), name="github-warmup", daemon=True).start()
+    return client
+
+def _github_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Call GitHub with exponential backoff on rate limiting and transient gateway errors"""
+    client = get_github_client()
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        response = client.request(method, url, **kwargs)
+        if response.status_code not in GITHUB_RETRY_STATUSES or attempt == GITHUB_MAX_RETRIES:
+            return response
+        retry_after = response.headers.get("Retry-After", "")
+        time.sleep(min(float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt, GITHUB_MAX_BACKOFF))
+
+class _EtagCache:
+    """URL -> (ETag, slimmed body, next page URL), least recently used entries evicted beyond maxsize"""
+
+    def __init__(self, maxsize: int):
+        self._entries: "OrderedDict[str, Tuple[str, List[Dict], Optional[str]]]" = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()  # shared by the fetch worker threads
+
+    def get(self, key: str) -> Optional[Tuple[str, List[Dict], Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: Tuple[str, List[Dict], Optional[str]]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def _etag_cache() -> _EtagCache:
+    """Kept across script reruns; a 304 reply has no body and costs no rate limit"""
+    return _EtagCache(GITHUB_ETAG_CACHE_SIZE)
+
+_RELEASE_KEYS = ("tag_name", "published_at", "body", "draft")
+
+def _slim_release(release: Dict) -> Dict:
+    """Only the release fields analyze_releases reads"""
+    return {key: release[key] for key in _RELEASE_KEYS if key in release}
+
+def _slim_issue(issue: Dict) -> Dict:
+    """Only the issue fields analyze_issues reads"""
+    slim = {"title": issue["title"]} if "title" in issue else {}
+    slim["labels"] = [{"name": label.get("name", "")} for label in issue.get("labels", [])]
+    return slim
+
+def _github_get_json(
+    url: str, slim: Callable[[Dict], Dict], params: Optional[Dict] = None
+) -> Tuple[int, List[Dict], Optional[str]]:
+    """Status, slimmed items and the Link rel="next" URL, revalidating previously seen responses with If-None-Match"""
+    cache = _etag_cache()
+    key = str(httpx.URL(url, params=params))
+    cached = cache.get(key)
+    response = _github_request("GET", url, params=params, headers={"If-None-Match": cached[0]} if cached else {})
+    if response.status_code == 304 and cached:
+        return 200, cached[1], cached[2]
+    if response.status_code != 200:
+        return response.status_code, [], None
     
+    data = [slim(item) for item in orjson.loads(response.content)]
+    next_url = response.links.get("next", {}).get("url")
+    if response.headers.get("ETag"):
+        cache.put(key, (response.headers["ETag"], data, next_url))
+    return 200, data, next_url
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_github_data(owner: str, repo: str) -> Dict:
+    """Fetch real GitHub data using the API.
+
+    Raises GitHubAPIError rather than returning a partial result, so only complete fetches are cached.
+    Runs on worker threads, so the dashboard shows the error rather than this calling st.error.
+    """
     releases_url = f"https://api.github.com/repos/{owner}/{repo}/releases"
     issues_url = f"https://api.github.com/repos/{owner}/{repo}/issues"
     
     try:
-        # Get recent releases
-        releases_response = requests.get(releases_url, headers=headers)
-        if releases_response.status_code == 200:
-            releases_data = releases_response.json()
-        else:
-            st.error(f"GitHub API Error {releases_response.status_code} for {owner}/{repo} releases")
-            releases_data = []
+        # Get recent releases - only the 5 we show, rather than GitHub's default page of 30
+        status, releases_data, _ = _github_get_json(releases_url, _slim_release, params={"per_page": 5})
+        if status != 200:
+            raise GitHubAPIError(f"GitHub API Error {status} for {owner}/{repo} releases")
         
-        # Get recent issues (last 7 days)
-        cutoff_date = (datetime.now() - timedelta(days=7)).isoformat()
+        # Get recent issues (last 7 days); floored to the hour so repeat requests match the cached ETag
+        cutoff = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=7)
+        cutoff_date = cutoff.isoformat()
         issues_params = {
             "since": cutoff_date, 
             "state": "all", 
             "per_page": 100,
             "sort": "created"
         }
-        issues_response = requests.get(issues_url, headers=headers, params=issues_params)
-        if issues_response.status_code == 200:
-            issues_data = issues_response.json()
-        else:
-            st.error(f"GitHub API Error {issues_response.status_code} for {owner}/{repo} issues")
-            issues_data = []
+        status, issues_data, next_url = _github_get_json(issues_url, _slim_issue, params=issues_params)
         
-        return {
-            "releases": releases_data[:5],  # Last 5 releases
-            "issues": issues_data,
-            "status": "success"
-        }
-        
-    except Exception as e:
-        st.error(f"Error fetching data for {owner}/{repo}: {e}")
-        return {"releases": [], "issues": [], "status": "error"}
+        # Every issue returned is inside the window, so a next page only exists when the week spans more than one
+        if next_url:
+            issues_data = list(issues_data)  # the first page is shared with the ETag cache
+        for _ in range(GITHUB_MAX_ISSUE_PAGES - 1):
+            if status != 200 or not next_url:
+                break
+            status, page, next_url = _github_get_json(next_url, _slim_issue)
+            issues_data.extend(page)
+        if status != 200:
+            raise GitHubAPIError(f"GitHub API Error {status} for {owner}/{repo} issues")
+    except (httpx.HTTPError, ValueError) as e:
+        raise GitHubAPIError(f"Error fetching data for {owner}/{repo}: {e}") from e
+    
+    return {
+        "releases": releases_data,  # Last 5 releases
+        "issues": issues_data,
+    }
+
+# Releases and pages of the week's issues, aliased to the field names of the REST objects analyze_* reads
+_GRAPHQL_RELEASES_FIELD = """
+    releases(first: 5, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { tag_name: tagName published_at: publishedAt body: description draft: isDraft }
+    }
+"""
+
+def _graphql_issues_field(i: int) -> str:
+    """One 100-issue page of the week's issues, starting after the $c{i} endCursor (null for the first page)"""
+    return f"""
+    issues(first: 100, after: $c{i}, filterBy: {{since: $since}}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+      nodes {{ title labels(first: 10) {{ nodes {{ name }} }} }}
+      pageInfo {{ hasNextPage endCursor }}
+    }}
+"""
+
+def _github_graphql(
+    pages: Dict[int, Tuple[str, str, Optional[str]]], since: str, with_releases: bool = False
+) -> Dict[int, Dict]:
+    """Aliased repository lookups in one request: index -> (owner, repo, issues cursor) in, index -> repository out.
+
+    Every value is passed as a query variable, so the query text only depends on which indexes are asked for.
+    """
+    declarations = ["$since: DateTime"]
+    variables: Dict[str, Any] = {"since": since}
+    selections = []
+    for i, (owner, repo, after) in pages.items():
+        declarations += [f"$o{i}: String!", f"$n{i}: String!", f"$c{i}: String"]
+        variables.update({f"o{i}": owner, f"n{i}": repo, f"c{i}": after})
+        fields = (_GRAPHQL_RELEASES_FIELD if with_releases else "") + _graphql_issues_field(i)
+        selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{fields}}}\n")
+    query = f"query({', '.join(declarations)}) {{\n{''.join(selections)}}}"
+    
+    try:
+        response = _github_request(
+            "POST", "https://api.github.com/graphql", json={"query": query, "variables": variables}
+        )
+        if response.status_code != 200:
+            raise GitHubAPIError(f"GitHub GraphQL API Error {response.status_code}")
+        data = orjson.loads(response.content).get("data") or {}
+    except (httpx.HTTPError, ValueError) as e:
+        raise GitHubAPIError(f"Error fetching GitHub GraphQL data: {e}") from e
+    
+    results = {}
+    for i, (owner, repo, _) in pages.items():
+        # A missing or private repository nulls its own alias
+        if data.get(f"r{i}") is None:
+            raise GitHubAPIError(f"GitHub GraphQL returned no repository for {owner}/{repo}")
+        results[i] = data[f"r{i}"]
+    return results
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_github_data_graphql(repos: Tuple[Tuple[str, str], ...]) -> Dict[str, Dict]:
+    """GitHub data for every repository from batched GraphQL requests, keyed by "owner/repo".
+
+    One request covers every repository's releases and first issues page; further issue pages, up to
+    GITHUB_MAX_ISSUE_PAGES as on the REST path, take one more request per round for all repositories still paging.
+
+    Raises GitHubAPIError when the query fails or any repository is missing, so nothing partial is cached;
+    the caller then falls back to per-repository REST calls, which report the failing repository on its own.
+    """
+    cutoff = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=7)
+    since = cutoff.isoformat()
+    first_pages = _github_graphql(
+        {i: (owner, repo, None) for i, (owner, repo) in enumerate(repos)}, since, with_releases=True
+    )
+    
+    results = {}
+    issue_pages = {}
+    for i, repository in first_pages.items():
+        owner, repo = repos[i]
+        results[f"{owner}/{repo}"] = {"releases": repository["releases"]["nodes"], "issues": []}
+        issue_pages[i] = repository["issues"]
+    
+    for page in range(1, GITHUB_MAX_ISSUE_PAGES + 1):
+        next_pages = {}
+        for i, connection in issue_pages.items():
+            owner, repo = repos[i]
+            results[f"{owner}/{repo}"]["issues"].extend(
+                {"title": issue["title"], "labels": issue["labels"]["nodes"]} for issue in connection["nodes"]
+            )
+            if connection["pageInfo"]["hasNextPage"]:
+                next_pages[i] = (owner, repo, connection["pageInfo"]["endCursor"])
+        if not next_pages or page == GITHUB_MAX_ISSUE_PAGES:
+            break
+        issue_pages = {i: repository["issues"] for i, repository in _github_graphql(next_pages, since).items()}
+    return results
 
 def analyze_releases(releases: List[Dict]) -> Dict:
     """Analyze release data to extract key features"""
     recent_releases = []
-    key_features = []
-    breaking_changes = []
+    # Dicts as insertion-ordered sets: deduped as they're collected, newest release first
+    key_features: Dict[str, None] = {}
+    breaking_changes: Dict[str, None] = {}
     
     for release in releases:
         if not release.get("draft", False):
+            body_raw = release.get("body") or ""
             release_info = {
                 "version": release.get("tag_name", "Unknown"),
                 "date": release.get("published_at", "")[:10] if release.get("published_at") else "",
-                "description": release.get("body", "")[:200] + "..." if len(release.get("body", "")) > 200 else release.get("body", "")
+                "description": body_raw[:200] + ("..." if len(body_raw) > 200 else "")
             }
             recent_releases.append(release_info)
             
-            # Extract features from release notes
-            body = release.get("body", "").lower()
-            if any(word in body for word in ["feature", "new", "add", "implement"]):
-                feature_lines = [line.strip() for line in body.split('\n') 
-                               if any(word in line.lower() for word in ["feature", "new", "add", "implement"])]
-                key_features.extend(feature_lines[:2])  # Take first 2 feature mentions
+            # Only the first 5 features and 3 breaking changes are reported, so stop reading notes once both are found
+            if len(key_features) >= 5 and len(breaking_changes) >= 3:
+                continue
             
-            # Check for breaking changes
-            if any(word in body for word in ["breaking", "deprecated", "removed"]):
-                breaking_lines = [line.strip() for line in body.split('\n') 
-                                if any(word in line.lower() for word in ["breaking", "deprecated", "removed"])]
-                breaking_changes.extend(breaking_lines[:2])
+            # Extract features and breaking changes from release notes in one walk over the lines,
+            # lowercasing the whole body once rather than line by line
+            feature_lines = []
+            breaking_lines = []
+            for line in body_raw.lower().split('\n'):
+                found = _match_release_line(line)
+                if "feature" in found:
+                    feature_lines.append(line.strip())
+                if "breaking" in found:
+                    breaking_lines.append(line.strip())
+                if len(feature_lines) >= 2 and len(breaking_lines) >= 2:
+                    break
+            key_features.update(dict.fromkeys(feature_lines[:2]))  # Take first 2 feature mentions
+            breaking_changes.update(dict.fromkeys(breaking_lines[:2]))
     
     return {
         "recent_releases": recent_releases,
-        "key_features": list(set(key_features))[:5],  # Dedupe and limit
-        "breaking_changes": list(set(breaking_changes))[:3]
+        "key_features": list(key_features)[:5],
+        "breaking_changes": list(breaking_changes)[:3]
     }
 
 def analyze_issues(issues: List[Dict]) -> Dict:
@@ -92,33 +345,29 @@ def analyze_issues(issues: List[Dict]) -> Dict:
     if not issues:
         return {"recurring_issues": [], "critical_bugs": [], "feature_requests": []}
     
-    # Categorize issues
+    # Categorize issues and collect title words in one pass, lowercasing and tokenizing each title once
     bug_issues = []
     feature_requests = []
-    all_titles = []
+    title_words = []
     
     for issue in issues:
         title = issue.get("title", "")
-        labels = [label.get("name", "") for label in issue.get("labels", [])]
-        
-        all_titles.append(title.lower())
+        title_lower = title.lower()
+        labels = {label.get("name", "").lower() for label in issue.get("labels", [])}
         
-        # Categorize by labels or keywords
-        if any(label.lower() in ["bug", "error", "crash", "problem"] for label in labels) or \
-           any(word in title.lower() for word in ["bug", "error", "crash", "issue", "problem", "broken"]):
+        # Categorize by labels or keywords (substring match, so "crashes" still counts as "crash")
+        found = _match_issue_title(title_lower)
+        if labels & _BUG_LABELS or "bug" in found:
             bug_issues.append(title)
         
-        if any(label.lower() in ["enhancement", "feature", "request"] for label in labels) or \
-           any(word in title.lower() for word in ["feature", "request", "enhancement", "add", "support"]):
+        if labels & _FEATURE_LABELS or "feature" in found:
             feature_requests.append(title)
+        
+        title_words.extend(_LONG_WORD_RE.findall(title_lower))
     
-    # Find recurring patterns in issue titles
-    word_counts = Counter()
-    for title in all_titles:
-        words = re.findall(r'\b\w+\b', title)
-        # Focus on technical terms (longer words)
-        important_words = [w for w in words if len(w) > 4 and w not in ["issue", "error", "problem"]]
-        word_counts.update(important_words)
+    # Find recurring patterns in issue titles, focusing on technical terms (longer words);
+    # one Counter build over every title's words instead of an update() per title
+    word_counts = Counter(w for w in title_words if w not in _STOP_WORDS)
     
     recurring_patterns = []
     for word, count in word_counts.most_common(5):
@@ -131,6 +380,35 @@ def analyze_issues(issues: List[Dict]) -> Dict:
         "feature_requests": feature_requests[:5]  # Top 5 feature requests
     }
 
+@st.cache_data(ttl=600, show_spinner=False)
+def analyze_competitor(project_name: str, owner: str, repo: str) -> Dict:
+    """Fetch and analyze one competitor, memoized so repeat clicks within 10 minutes skip both steps.
+
+    A GitHubAPIError from the fetch propagates, so failed fetches are not memoized.
+    """
+    return analyze_github_data(project_name, get_github_data(owner, repo))
+
+def analyze_github_data(project_name: str, github_data: Dict) -> Dict:
+    """Release and issue analysis for one competitor's fetched GitHub data"""
+    # Analyze releases
+    release_analysis = analyze_releases(github_data["releases"])
+    
+    # Analyze issues  
+    issue_analysis = analyze_issues(github_data["issues"])
+    
+    # Combine analysis
+    analysis = {
+        "project_name": project_name,
+        "recent_releases": release_analysis["recent_releases"],
+        "key_features": release_analysis["key_features"],
+        "breaking_changes": release_analysis["breaking_changes"],
+        "recurring_issues": issue_analysis["recurring_issues"],
+        "critical_bugs": issue_analysis["critical_bugs"],
+        "feature_requests": issue_analysis["feature_requests"],
+        "total_issues": len(github_data["issues"])
+    }
+    return analysis
+
 def display_streamlit_dashboard():
     """Streamlit dashboard for competitive intelligence"""
     st.set_page_config(
@@ -144,8 +422,7 @@ def display_streamlit_dashboard():
     st.markdown("---")
     
     # Check GitHub token
-    github_token = os.getenv("GITHUB_TOKEN")
-    if not github_token:
+    if not _GITHUB_TOKEN:
         st.error("❌ GitHub token not found! Please set GITHUB_TOKEN in your .env file")
         return
     
@@ -171,47 +448,55 @@ def display_streamlit_dashboard():
     # Analysis controls
     if st.sidebar.button("🔄 Analyze Competitors", type="primary"):
         with st.spinner("Fetching data from GitHub..."):
-            analyses = []
+            analyses_by_name = {}
             progress_bar = st.progress(0)
             
-            for i, (project_name, config) in enumerate(selected_competitors.items()):
-                st.write(f"Analyzing {project_name}...")
-                
-                # Fetch GitHub data
-                github_data = get_github_data(config["owner"], config["repo"])
+            jobs = {name: (config["owner"], config["repo"]) for name, config in selected_competitors.items()}
+            # One GraphQL request covers every competitor; per-competitor REST fetches are the fallback
+            try:
+                github_batch = get_github_data_graphql(tuple(jobs.values())) if jobs else None
+            except GitHubAPIError:
+                github_batch = None
+            with ThreadPoolExecutor(max_workers=max(1, min(8, len(jobs)))) as executor:
+                # (project name, callable returning its analysis or raising GitHubAPIError)
+                if github_batch is not None:
+                    completed = (
+                        (name, partial(analyze_github_data, name, github_batch[f"{owner}/{repo}"]))
+                        for name, (owner, repo) in jobs.items()
+                    )
+                else:
+                    # Fetches are independent and network-bound, so overlap them
+                    futures = {
+                        executor.submit(analyze_competitor, name, owner, repo): name
+                        for name, (owner, repo) in jobs.items()
+                    }
+                    completed = ((futures[future], future.result) for future in as_completed(futures))
                 
-                if github_data["status"] == "success":
-                    # Analyze releases
-                    release_analysis = analyze_releases(github_data["releases"])
+                for i, (project_name, get_analysis) in enumerate(completed):
+                    st.write(f"Analyzing {project_name}...")
                     
-                    # Analyze issues  
-                    issue_analysis = analyze_issues(github_data["issues"])
+                    try:
+                        analyses_by_name[project_name] = get_analysis()
+                    except GitHubAPIError as e:
+                        st.error(str(e))
                     
-                    # Combine analysis
-                    analysis = {
-                        "project_name": project_name,
-                        "recent_releases": release_analysis["recent_releases"],
-                        "key_features": release_analysis["key_features"],
-                        "breaking_changes": release_analysis["breaking_changes"],
-                        "recurring_issues": issue_analysis["recurring_issues"],
-                        "critical_bugs": issue_analysis["critical_bugs"],
-                        "feature_requests": issue_analysis["feature_requests"],
-                        "total_issues": len(github_data["issues"])
-                    }
-                    analyses.append(analysis)
-                
-                progress_bar.progress((i + 1) / len(selected_competitors))
+                    progress_bar.progress((i + 1) / len(jobs))
             
-            # Generate industry insights
-            all_features = []
-            all_issues = []
-            for analysis in analyses:
-                all_features.extend(analysis["key_features"])
-                all_issues.extend([p["pattern"] for p in analysis["recurring_issues"]])
+            # Keep the sidebar selection order for display (and for tie-breaking in the trend counts).
+            # The fields the industry insights aggregate are also kept as flat per-competitor lists
+            analyses = []
+            features_by_comp: List[List[str]] = []
+            issue_patterns_by_comp: List[List[str]] = []
+            for name in jobs:
+                if name in analyses_by_name:
+                    analysis = analyses_by_name[name]
+                    analyses.append(analysis)
+                    features_by_comp.append(analysis["key_features"])
+                    issue_patterns_by_comp.append([p["pattern"] for p in analysis["recurring_issues"]])
             
-            # Find common trends
-            feature_counter = Counter(all_features)
-            issue_counter = Counter(all_issues)
+            # Generate industry insights: find common trends
+            feature_counter = Counter(chain.from_iterable(features_by_comp))
+            issue_counter = Counter(chain.from_iterable(issue_patterns_by_comp))
             
             industry_trends = [f"Common focus: {feature}" for feature, count in feature_counter.most_common(3) if count > 1]
             if not industry_trends:
@@ -329,4 +614,5 @@ def display_streamlit_dashboard():
         """)
 
 if __name__ == "__main__":
+    get_github_client()  # start warming the connection before the page renders
     display_streamlit_dashboard()
@@ -0,0 +1,41 @@
+import json
+
+from agno_app import CompetitorAnalysis, IssuePattern, Release, lru_get, lru_put, render_competitor_html, trim_release_body
+
+
+def test_trim_release_body_strips_lf_tables():
+    assert trim_release_body("Intro\n| a | b |\n|---|---|\nOutro") == "Intro\nOutro"
+
+
+def test_trim_release_body_strips_crlf_tables():
+    assert trim_release_body("Intro\r\n| a | b |\r\n|---|---|\r\n| 1 | 2 |\r\nOutro") == "Intro\r\nOutro"
+
+
+def test_lru_recency_survives_key_reordering_storage():
+    cache = []
+    for key in ("c", "a", "b"):
+        lru_put(cache, key, key.upper(), maxsize=3)
+    assert lru_get(cache, "c") == "C"
+    # JSONB sorts object keys on write; the pairs list keeps recency through a round-trip
+    cache = json.loads(json.dumps({"cache": cache}, sort_keys=True))["cache"]
+    lru_put(cache, "d", "D", maxsize=3)
+    assert [key for key, _ in cache] == ["b", "c", "d"]
+
+
+def test_render_competitor_html_only_links_to_github():
+    analysis = CompetitorAnalysis(
+        project_name="X",
+        repository_url="javascript:alert(1)",
+        recent_releases=[
+            Release(project_name="X", version="v1", description="d", date="d", url="data:text/html,<script>"),
+            Release(project_name="X", version="v2", description="d", date="d", url="https://github.com/o/r/releases/v2"),
+        ],
+        key_features=[],
+        recurring_issues=[
+            IssuePattern(pattern="bug", count=2, example_links=["javascript:x", "https://github.com/o/r/issues/1"]),
+        ],
+    )
+    html = render_competitor_html(analysis)
+    assert "javascript:" not in html and "data:" not in html
+    assert 'href="https://github.com/o/r/releases/v2"' in html
+    assert '<a href="https://github.com/o/r/issues/1" target="_blank">Example 1 →</a>' in html
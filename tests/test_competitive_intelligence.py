@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from agno.run.response import RunResponse
+
+import competitive_intelligence as ci
+
+
+class StubAgent:
+    def __init__(self, content):
+        self.content = content
+
+    def deep_copy(self, **kwargs):
+        return self
+
+    def run(self, prompt, **kwargs):
+        return RunResponse(content=self.content)
+
+    async def arun(self, prompt, **kwargs):
+        return RunResponse(content=self.content)
+
+
+def github(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/graphql"):
+        return httpx.Response(200, json={"data": {}})  # every repository missing, so REST answers
+    if request.url.path.endswith("/releases"):
+        return httpx.Response(200, json=[{"tag_name": "v1", "name": "v1", "body": "New router", "published_at": "p"}])
+    return httpx.Response(200, json=[{"title": "Crash on build", "state": "open", "labels": [{"name": "bug"}]}])
+
+
+def test_report_generation_future_returns_report(monkeypatch):
+    github_io = ci.GitHubIO()
+    github_io.client = httpx.AsyncClient(base_url=ci.GITHUB_API_URL, transport=httpx.MockTransport(github))
+    monkeypatch.setattr(ci, "get_github_io", lambda: github_io)
+
+    analysis = ci.CompetitorAnalysis(
+        project_name="Next.js",
+        recent_releases=[ci.Release(project_name="Next.js", version="v1", description="New router", date="p")],
+        key_features=["router"],
+        recurring_issues=[ci.IssuePattern(pattern="Crashes", count=2)],
+    )
+    report = ci.WeeklyReport(
+        report_date="2026-10-14", analyses=[analysis], industry_trends=["t"], recommendations=["r"]
+    )
+    workflow = ci.CompetitiveIntelligenceWorkflow(session_id="test")
+    workflow.data_analyzer = StubAgent(ci.CompetitiveAnalysesList(analyses=[analysis]))
+    workflow.report_generator = StubAgent(report)
+
+    # Submitted the way start_report_generation does, through agno's run() wrapper
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        response = executor.submit(workflow.run, use_cache=False).result()
+
+    assert isinstance(response, RunResponse)
+    assert response.content == report